@@ -0,0 +1 @@
+"""Shared helpers for the Signal Processing Virtual Lab pages."""
@@ -0,0 +1,280 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import soundfile as sf
+import streamlit as st
+from scipy import signal
+from scipy.io import wavfile
+
+# Frames decoded per block
+BLOCK_FRAMES = 65536
+
+# Ceiling on the decoded buffer, overridable with LAB_MAX_AUDIO_MB
+MAX_DECODED_BYTES = int(os.environ.get("LAB_MAX_AUDIO_MB", "512")) * 1024 * 1024
+
+# Taps per decimation factor of the anti-aliasing FIR used when downsampling
+DECIMATION_TAPS_PER_FACTOR = 20
+
+# Uploads at least this large are spilled to disk and memory-mapped, overridable with LAB_MMAP_MIN_MB
+MMAP_MIN_BYTES = int(os.environ.get("LAB_MMAP_MIN_MB", "64")) * 1024 * 1024
+
+# Spilled uploads by content digest
+_spill_dir = None
+_spilled = {}
+_spill_lock = threading.Lock()
+
+
+class AudioTooLargeError(ValueError):
+    """Raised when a decoded recording would exceed the memory ceiling."""
+
+
+class _StreamingDecimator:
+    """Low-pass filters and keeps every factor-th sample, carrying state across blocks."""
+
+    def __init__(self, factor, channels):
+        self.factor = factor
+        self.taps = signal.firwin(DECIMATION_TAPS_PER_FACTOR * factor + 1, 1.0 / factor).astype(np.float32)
+        self.state = np.zeros((len(self.taps) - 1, channels), dtype=np.float32)
+        self.phase = 0
+
+    def process(self, block):
+        filtered, self.state = signal.lfilter(self.taps, 1.0, block, axis=0, zi=self.state)
+        kept = filtered[self.phase::self.factor]
+        # Position of the next kept sample relative to the start of the next block
+        self.phase = (self.phase - len(block)) % self.factor
+        return kept
+
+
+def read_audio(source, mono=True, normalize=True, target_rate=None, block_frames=BLOCK_FRAMES,
+               max_bytes=MAX_DECODED_BYTES, progress=None):
+    """
+    Decodes an audio file block by block into a float32 buffer.
+
+    Each block is mixed down to mono (if mono), optionally low-pass filtered
+    and decimated by the integer factor that brings the rate closest to
+    target_rate from above, and written into a preallocated buffer, so peak
+    memory is the output plus one block. normalize scales the result to a
+    peak of 1 in place. progress, if given, is called with the fraction done.
+
+    Raises AudioTooLargeError if the output would exceed max_bytes.
+
+    Returns (audio, sample_rate), audio being (frames,) or (frames, channels).
+    """
+    with sf.SoundFile(source) as audio_file:
+        sample_rate = audio_file.samplerate
+        channels = 1 if mono else audio_file.channels
+        factor = max(int(sample_rate // target_rate), 1) if target_rate else 1
+        out_frames = -(-audio_file.frames // factor)
+        needed = out_frames * channels * np.dtype(np.float32).itemsize
+        if needed > max_bytes:
+            raise AudioTooLargeError(
+                f"Decoded audio needs {needed / 2**20:.0f} MB, above the {max_bytes / 2**20:.0f} MB limit"
+            )
+
+        buffer = np.empty((out_frames, channels), dtype=np.float32)
+        decimator = _StreamingDecimator(factor, channels) if factor > 1 else None
+        position = 0
+        peak = 0.0
+        for block in audio_file.blocks(blocksize=block_frames, dtype='float32', always_2d=True):
+            if mono and block.shape[1] > 1:
+                block = block.mean(axis=1, keepdims=True, dtype=np.float32)
+            if decimator is not None:
+                block = decimator.process(block)
+            block = block[:out_frames - position]
+            buffer[position:position + len(block)] = block
+            position += len(block)
+            if len(block):
+                peak = max(peak, float(np.max(np.abs(block))))
+            if progress is not None:
+                progress(min(position / max(out_frames, 1), 1.0))
+
+    buffer = buffer[:position]
+    if normalize and peak > 0:
+        buffer *= np.float32(1.0 / peak)
+    if mono:
+        buffer = buffer[:, 0]
+    if sample_rate % factor == 0:
+        return buffer, sample_rate // factor
+    return buffer, sample_rate / factor
+
+
+def read_audio_with_progress(source, label="Decoding audio...", **kwargs):
+    """Runs read_audio while showing a Streamlit progress bar, see read_audio."""
+    progress_bar = st.progress(0.0, text=label)
+    try:
+        return read_audio(source, progress=lambda fraction: progress_bar.progress(fraction, text=label), **kwargs)
+    finally:
+        progress_bar.empty()
+
+
+class MappedAudio:
+    """
+    A WAV file's PCM samples, memory-mapped, with scaling applied lazily.
+
+    Indexing along the frame axis returns float32 samples for the indexed
+    frames only, with the PCM offset removed, scaled and, if mono, mixed
+    down, so blockwise consumers never hold more than a block in memory.
+    Operations that need the whole signal as an array materialize it
+    through __array__.
+    """
+
+    # File-backed, so the mapping does not count as resident memory
+    nbytes = 0
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, pcm, sample_rate, scale, offset=0.0, mono=False, key=None, file_bytes=0):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.scale = scale
+        self.offset = offset
+        self.mono = mono and pcm.ndim == 2
+        self.key = key
+        self.file_bytes = file_bytes
+        self._peak = None
+        self._views = {}
+
+    @property
+    def shape(self):
+        return self.pcm.shape[:1] if self.mono else self.pcm.shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def cache_key(self):
+        """Identifies the samples for cache keys without reading them."""
+        return ("mapped_audio", self.key, self.scale, self.offset, self.mono)
+
+    def __len__(self):
+        return self.pcm.shape[0]
+
+    def __getitem__(self, index):
+        block = self.pcm[index]
+        if self.mono:
+            block = block.mean(axis=-1, dtype=np.float32)
+        block = np.asarray(block, dtype=np.float32)
+        if self.offset:
+            block = block - np.float32(self.offset)
+        return block * np.float32(self.scale)
+
+    def __array__(self, dtype=None, copy=None):
+        return self[:] if dtype is None else self[:].astype(dtype)
+
+    def blocks(self, block_frames=BLOCK_FRAMES):
+        """Yields consecutive float32 blocks of block_frames frames."""
+        for start in range(0, len(self), block_frames):
+            yield self[start:start + block_frames]
+
+    def peak(self):
+        """Returns the largest absolute sample, scanning the file once block by block."""
+        if self._peak is None:
+            self._peak = max((float(np.max(np.abs(block))) for block in self.blocks() if block.size), default=0.0)
+        return self._peak
+
+    def _derived(self, scale=None, mono=None):
+        return MappedAudio(self.pcm, self.sample_rate, self.scale if scale is None else scale,
+                           self.offset, self.mono if mono is None else mono, self.key, self.file_bytes)
+
+    def mixed_to_mono(self):
+        """Returns a view that mixes the channels down to mono on access."""
+        return self._derived(mono=True)
+
+    def normalized(self):
+        """Returns a view scaled to a peak of 1, without copying the samples."""
+        peak = self.peak()
+        if peak == 0:
+            return self
+        normalized = self._derived(scale=self.scale / peak)
+        normalized._peak = 1.0
+        return normalized
+
+    def view(self, mono=False, normalize=False):
+        """Returns this audio mixed down and/or normalized, derived once per combination."""
+        view = self._views.get((mono, normalize))
+        if view is None:
+            view = self.mixed_to_mono() if mono else self
+            if normalize:
+                view = view.normalized()
+            self._views[(mono, normalize)] = view
+        return view
+
+    def decimate(self, factor, block_frames=BLOCK_FRAMES):
+        """
+        Returns the signal low-pass filtered and decimated by an integer
+        factor, computed block by block, as a float32 array.
+        """
+        channels = 1 if self.ndim == 1 else self.shape[1]
+        decimator = _StreamingDecimator(factor, channels)
+        out = np.empty((-(-len(self) // factor), channels), dtype=np.float32)
+        position = 0
+        for block in self.blocks(block_frames):
+            kept = decimator.process(block.reshape(len(block), channels))
+            out[position:position + len(kept)] = kept
+            position += len(kept)
+        out = out[:position]
+        return out[:, 0] if self.ndim == 1 else out
+
+
+def as_signal(x):
+    """Returns x unchanged if it is MappedAudio, for blockwise access, else as an array."""
+    return x if isinstance(x, MappedAudio) else np.asarray(x)
+
+
+def map_wav(path, key=None):
+    """
+    Memory-maps a WAV file's PCM payload with scipy.io.wavfile.
+
+    Raises ValueError for files that cannot be mapped, such as 24-bit PCM.
+
+    Returns a MappedAudio scaled to [-1, 1].
+    """
+    sample_rate, pcm = wavfile.read(path, mmap=True)
+    file_bytes = os.path.getsize(path)
+    if pcm.dtype == np.uint8:
+        return MappedAudio(pcm, sample_rate, 1 / 128, offset=128, key=key, file_bytes=file_bytes)
+    if np.issubdtype(pcm.dtype, np.integer):
+        return MappedAudio(pcm, sample_rate, 1 / -np.iinfo(pcm.dtype).min, key=key, file_bytes=file_bytes)
+    return MappedAudio(pcm, sample_rate, 1.0, key=key, file_bytes=file_bytes)
+
+
+def spill_to_disk(source, digest):
+    """
+    Writes an upload to a temporary file, once per content digest, and
+    returns its path. The file stays until release_spill(digest).
+    """
+    global _spill_dir
+    with _spill_lock:
+        path = _spilled.get(digest)
+        if path is not None:
+            return path
+        if _spill_dir is None:
+            _spill_dir = tempfile.mkdtemp(prefix="lab-uploads-")
+            atexit.register(shutil.rmtree, _spill_dir, True)
+        path = os.path.join(_spill_dir, f"{digest}.wav")
+        source.seek(0)
+        with open(path, "wb") as file:
+            shutil.copyfileobj(source, file, BLOCK_FRAMES * 16)
+        source.seek(0)
+        _spilled[digest] = path
+        return path
+
+
+def release_spill(digest):
+    """
+    Deletes the temporary file spill_to_disk wrote for a content digest, if
+    any. Existing memory maps of it stay readable; the disk space is freed
+    once the last one is closed.
+    """
+    with _spill_lock:
+        path = _spilled.pop(digest, None)
+    if path is not None:
+        try:
+            os.remove(path)
+        except OSError:
+            # Platforms that refuse to delete a mapped file leave it to the exit cleanup
+            pass
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _update_digest(digest, part):
+    """Feeds one key part into a hash, handling arrays, bytes and nesting."""
+    if isinstance(part, np.ndarray):
+        array = np.ascontiguousarray(part)
+        digest.update(f"ndarray{array.dtype.str}{array.shape}".encode())
+        digest.update(array.view(np.uint8).data if array.size else b"")
+    elif hasattr(part, "cache_key"):
+        # Objects such as memory-mapped audio identify themselves without being read
+        _update_digest(digest, part.cache_key)
+    elif isinstance(part, (bytes, bytearray, memoryview)):
+        digest.update(b"bytes%d:" % len(part))
+        digest.update(part)
+    elif isinstance(part, (list, tuple)):
+        digest.update(f"{type(part).__name__}{len(part)}(".encode())
+        for item in part:
+            _update_digest(digest, item)
+        digest.update(b")")
+    elif isinstance(part, dict):
+        _update_digest(digest, sorted(part.items(), key=lambda item: repr(item[0])))
+    else:
+        digest.update(f"{type(part).__name__}:{part!r};".encode())
+
+
+def make_key(*parts):
+    """Returns a SHA-256 hex digest identifying a cached value's inputs."""
+    digest = hashlib.sha256()
+    for part in parts:
+        _update_digest(digest, part)
+    return digest.hexdigest()
+
+
+class LRUByteCache:
+    """
+    Thread-safe LRU cache with a byte budget. Subclasses size entries with
+    _sizeof and release what evicted entries hold with _evicted.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _sizeof(data):
+        """Returns the bytes an entry counts against the budget."""
+        return len(data)
+
+    def _evicted(self, key, data):
+        """Called for each entry dropped from the cache, to release what it holds."""
+
+    def get(self, key):
+        """Returns the cached value for a key, or None on a miss."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        """Stores a value for a key, evicting least recently used entries past the budget."""
+        size = self._sizeof(data)
+        if size > self.max_bytes:
+            self._evicted(key, data)
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= self._sizeof(previous)
+            self._entries[key] = data
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._sizeof(evicted)
+                self._evicted(evicted_key, evicted)
+
+    def clear(self):
+        """Drops every cached entry."""
+        with self._lock:
+            for key, data in self._entries.items():
+                self._evicted(key, data)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Returns the entry count, byte usage and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
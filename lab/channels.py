@@ -0,0 +1,56 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from lab.audio_io import as_signal
+
+# Upper bound on per-channel worker threads
+CHANNEL_MAX_WORKERS = 8
+
+
+def channel_count(audio):
+    """Returns the number of channels of a (frames,) or (frames, channels) signal."""
+    return 1 if np.ndim(audio) == 1 else np.shape(audio)[1]
+
+
+def mix_to_mono(audio):
+    """Returns the mean of a signal's channels, or the signal itself if it is mono."""
+    audio = np.asarray(audio)
+    return audio if audio.ndim == 1 else audio.mean(axis=1, dtype=audio.dtype)
+
+
+def map_channels(func, audio, *args, max_workers=None, progress=None, **kwargs):
+    """
+    Applies func(channel, *args, **kwargs) to every channel of a
+    (frames, channels) signal, one channel per worker thread. SciPy's
+    filtering, resampling and FFT routines release the GIL, so channels run
+    in parallel. A 1-D signal is passed to func directly.
+
+    func must return 1-D arrays of equal length. progress, if given, is
+    called from the calling thread with the fraction of channels done.
+
+    Returns the results stacked as (frames, channels).
+    """
+    audio = as_signal(audio)
+    if audio.ndim == 1:
+        result = func(audio, *args, **kwargs)
+        if progress is not None:
+            progress(1.0)
+        return result
+
+    channels = audio.shape[1]
+    if max_workers is None:
+        max_workers = min(CHANNEL_MAX_WORKERS, channels, os.cpu_count() or 1)
+    results = [None] * channels
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Each worker takes a contiguous copy of its column
+        futures = {
+            pool.submit(lambda c: func(np.ascontiguousarray(audio[:, c]), *args, **kwargs), c): c
+            for c in range(channels)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if progress is not None:
+                progress(done / channels)
+    return np.stack(results, axis=1)
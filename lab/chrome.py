@@ -0,0 +1,190 @@
+import base64
+import os
+from functools import lru_cache
+
+import streamlit as st
+
+# Repository root, so asset paths do not depend on the working directory
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Path to the institute logo shown in the header
+LOGO_PATH = os.path.join(ROOT_DIR, "static", "fcritlogo.png")
+
+# Custom CSS for scrollbar styling
+SCROLLBAR_CSS = """
+    <style>
+    /* Scrollbar track */
+    ::-webkit-scrollbar {
+        width: 16px;
+        height: 16px;
+    }
+
+    /* Scrollbar thumb (the draggable part) */
+    ::-webkit-scrollbar-thumb {
+        background-color: #888;
+        border-radius: 8px;
+        border: 3px solid transparent;
+        background-clip: content-box;
+    }
+
+    /* Scrollbar thumb on hover */
+    ::-webkit-scrollbar-thumb:hover {
+        background-color: #555;
+    }
+
+    /* Scrollbar track */
+    ::-webkit-scrollbar-track {
+        background: #f1f1f1;
+    }
+    </style>
+"""
+
+# Custom CSS and markup for the header, logo is filled in at build time
+HEADER_TEMPLATE = """
+    <style>
+    .header {{
+        position: fixed;
+        left: 0;
+        top: 0;
+        width: 100%;
+        height: 148px;
+        background-color: #00b3ff;
+        color: #FFFFFF;
+        text-align: center;
+        padding: 90px 10px;
+        z-index: 1000;
+        overflow: hidden;
+        display: flex;
+        align-items: center;
+        justify-content: space-between;
+    }}
+
+    .header-content {{
+        flex-grow: 1;
+        text-align: center;
+    }}
+
+
+    .header p {{
+        font-family: "Times New Roman", Times, serif;
+        font-size: 15px;
+        line-height: 1.2;
+        margin: 5px 0;
+    }}
+
+    .header p1 {{
+        font-family: "Times New Roman", Times, serif;
+        font-size: 30px;
+        line-height: 1.2;
+        margin: 5px 0;
+    }}
+
+    .header-content {{
+        flex-grow: 1;
+        text-align: center;
+        padding-top: 50px; /* Adjust this value to move text down */
+    }}
+
+    .logo-container {{
+        padding-right: 20px;
+        padding-top: 60px;
+    }}
+
+    .logo-container img {{
+        width: 100px;
+        height: auto;
+    }}
+    .stApp {{
+        margin-top: 180px; /* Push content below the fixed header */
+        padding-bottom: 80px; /* Avoid footer overlap */
+    }}
+
+    .footer {{
+        position: fixed;
+        left: 0;
+        bottom: 0;
+        width: 100%;
+        height: 42px;
+        background-color: #00b3ff;
+        color: #FFFFFF;
+        text-align: center;
+        padding: 10px;
+        font-size: 14px;
+        z-index: 1000;
+    }}
+    </style>
+
+    <!-- Header section with logo on the top-right corner -->
+    <div class="header">
+        <div class="header-content">
+            <p><b>AGNEL CHARITIES</b></p>
+            <p1><b>FR. C. RODRIGUES INSTITUTE OF TECHNOLOGY</b></p1>
+            <p>Agnel Technical Education Complex Sector 9-A, Vashi, Navi Mumbai, Maharashtra, India PIN - 400703</p>
+            <p>(An Autonomous Institute & Permanently Affiliated To University Of Mumbai)</p>
+        </div>
+        <div class="logo-container">
+            <img src="data:image/png;base64,{logo_base64}" alt="Institute Logo">
+        </div>
+    </div>
+"""
+
+# Footer markup
+FOOTER_HTML = """
+    <div class="footer">
+        <p>© Fr. Conceicao Rodrigues Institute of Technology. All rights reserved.</p>
+    </div>
+"""
+
+# Hide Streamlit default menu and remove unnecessary UI elements
+HIDE_MENU_CSS = """
+<style>
+#MainMenu {
+visibility:hidden;
+}
+[data-testid="stDecoration"] { display: none; }
+</style>
+"""
+
+
+def _file_mtime(path):
+    """Returns the modification time of a file, or None if it is missing."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _assemble_chrome(logo_base64):
+    """Returns the chrome snippets in the order they are rendered."""
+    return (
+        SCROLLBAR_CSS,
+        HEADER_TEMPLATE.format(logo_base64=logo_base64),
+        FOOTER_HTML,
+        HIDE_MENU_CSS,
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_chrome(logo_path, logo_mtime):
+    """Builds the page chrome snippets once per (logo path, mtime) pair."""
+    # logo_mtime is only part of the cache key, so an edited logo is re-encoded
+    with open(logo_path, "rb") as img_file:
+        logo_base64 = base64.b64encode(img_file.read()).decode()
+    return _assemble_chrome(logo_base64)
+
+
+def get_chrome_html(logo_path=LOGO_PATH):
+    """Returns the cached header, footer and styling snippets shared by every page."""
+    return _build_chrome(logo_path, _file_mtime(logo_path))
+
+
+def render_chrome(logo_path=LOGO_PATH):
+    """Renders the shared header, footer and styling on the current page."""
+    try:
+        snippets = get_chrome_html(logo_path)
+    except Exception as e:
+        st.error(f"Error encoding image: {e}")
+        snippets = _assemble_chrome("")
+    # Each snippet is its own markdown block so its HTML is parsed independently
+    for html in snippets:
+        st.markdown(html, unsafe_allow_html=True)
@@ -0,0 +1,89 @@
+import numpy as np
+from scipy.fft import irfft, rfft
+
+from lab.audio_io import as_signal
+from lab.cache import make_key
+from lab.ingest import IngestCache
+from lab.spectrum import fast_length, rfft_spectrum
+
+# Samples per block, and per impulse-response partition
+PARTITION_SIZE = 4096
+
+# Byte budget for cached impulse-response partition spectra
+PARTITION_CACHE_BYTES = 64 * 1024 * 1024
+
+# Shared by every session in the process
+partition_cache = IngestCache(PARTITION_CACHE_BYTES)
+
+
+def partition_spectra(ir, block_size=PARTITION_SIZE, cache=partition_cache):
+    """
+    Splits an impulse response into partitions of block_size taps and
+    returns their 2 * block_size-point spectra as a (partitions, bins)
+    array, computed once per impulse response and block size.
+    """
+    ir = np.asarray(ir, dtype=float)
+    key = make_key("ir_partitions", ir, block_size)
+    spectra = cache.get(key)
+    if spectra is None:
+        partitions = -(-len(ir) // block_size)
+        padded = np.zeros(partitions * block_size)
+        padded[:len(ir)] = ir
+        spectra = rfft(padded.reshape(partitions, block_size), 2 * block_size, axis=1, workers=-1)
+        spectra.setflags(write=False)
+        cache.put(key, spectra)
+    return spectra
+
+
+def stream_convolution(x, ir, block_size=PARTITION_SIZE):
+    """
+    Convolves a 1-D signal with an impulse response by uniformly
+    partitioned overlap-save, one block_size block at a time.
+
+    Each input block's spectrum enters a frequency-domain delay line and is
+    multiplied with the matching partition spectrum, so a block costs two
+    FFTs of 2 * block_size points plus one multiply-add per partition,
+    however long the impulse response.
+
+    Yields (start, block) for consecutive blocks of the full convolution,
+    len(x) + len(ir) - 1 samples in all.
+    """
+    x = as_signal(x)
+    spectra = partition_spectra(ir, block_size)
+    partitions, bins = spectra.shape
+    output_length = len(x) + len(ir) - 1
+    delay_line = np.zeros((partitions, bins), dtype=complex)
+    window = np.zeros(2 * block_size)
+    lags = np.arange(partitions)
+    for index, start in enumerate(range(0, output_length, block_size)):
+        # Slide the input window by one block, zero-padding past the end
+        window[:block_size] = window[block_size:]
+        block = x[start:start + block_size]
+        window[block_size:block_size + len(block)] = block
+        window[block_size + len(block):] = 0.0
+        delay_line[index % partitions] = rfft(window, workers=-1)
+        # Partition k meets the spectrum of the block k steps back
+        spectrum = np.einsum('ij,ij->j', delay_line[(index - lags) % partitions], spectra)
+        yield start, irfft(spectrum, 2 * block_size, workers=-1)[block_size:block_size + min(block_size, output_length - start)]
+
+
+def convolve_partitioned(x, ir, block_size=PARTITION_SIZE, progress=None):
+    """
+    Returns the full convolution of a 1-D signal with an impulse response,
+    see stream_convolution. progress, if given, is called with the fraction
+    done after each block.
+    """
+    x = as_signal(x)
+    output_length = len(x) + len(ir) - 1
+    out = np.empty(output_length, dtype=np.result_type(x.dtype, np.float32))
+    for start, block in stream_convolution(x, ir, block_size):
+        out[start:start + len(block)] = block
+        if progress is not None:
+            progress((start + len(block)) / output_length)
+    return out
+
+
+def impulse_response_spectrum(ir, fs, num_points=2000):
+    """Returns (freqs, h), the complex frequency response of an impulse response on about num_points frequencies."""
+    n_fft = max(fast_length(2 * num_points), fast_length(len(ir)))
+    return rfft_spectrum(ir, fs, n_fft=n_fft)
@@ -0,0 +1,156 @@
+import numpy as np
+from scipy.fft import irfft, next_fast_len, rfft
+
+# Above this many multiply-adds the FFT path is faster than the direct sum
+DIRECT_MAX_OPS = 200_000
+
+
+def _resolve_max_lag(n, max_lag):
+    """Clips the requested lag window to what a length-n signal supports."""
+    if max_lag is None:
+        return n - 1
+    return int(min(max(max_lag, 0), n - 1))
+
+
+def _one_sided_autocorr_direct(x, max_lag):
+    """Computes r[k] = sum x[i] x[i+k] for k = 0..max_lag by direct summation."""
+    n = len(x)
+    if max_lag == n - 1:
+        return np.correlate(x, x, mode='full')[n - 1:]
+    return np.array([np.dot(x[:n - k], x[k:]) for k in range(max_lag + 1)])
+
+
+def _one_sided_autocorr_fft(x, max_lag):
+    """Computes r[k] for k = 0..max_lag from the power spectrum of x."""
+    # Padding to n + max_lag keeps the circular wrap-around out of the window
+    n_fft = next_fast_len(len(x) + max_lag, real=True)
+    spectrum = rfft(x, n_fft)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    return irfft(power, n_fft)[:max_lag + 1]
+
+
+def autocorrelation(x, max_lag=None, method="auto"):
+    """
+    Computes the normalised autocorrelation of a signal.
+
+    The signal is mean-removed and the result is divided by n * var(x), so the
+    zero-lag value is 1. Only lags in [-max_lag, max_lag] are produced; the
+    default is every lag of the full correlation. method is "direct", "fft" or
+    "auto", which picks by problem size.
+
+    Returns (lags, correlation).
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+
+    max_lag = _resolve_max_lag(n, max_lag)
+    x_centered = x - np.mean(x)
+
+    if method == "auto":
+        method = "direct" if n * (max_lag + 1) <= DIRECT_MAX_OPS else "fft"
+    if method == "direct":
+        one_sided = _one_sided_autocorr_direct(x_centered, max_lag)
+    elif method == "fft":
+        one_sided = _one_sided_autocorr_fft(x_centered, max_lag)
+    else:
+        raise ValueError(f"Unknown autocorrelation method: {method}")
+
+    # Autocorrelation is even, so mirror the non-negative lags
+    correlation = np.concatenate((one_sided[:0:-1], one_sided))
+    scale = n * np.var(x)
+    if scale > 0:
+        correlation = correlation / scale
+    lags = np.arange(-max_lag, max_lag + 1)
+    return lags, correlation
+
+
+def _centered(x):
+    """Returns a mean-removed floating-point copy, keeping float32 inputs float32."""
+    x = np.asarray(x)
+    if not np.issubdtype(x.dtype, np.floating):
+        x = x.astype(float)
+    return x - x.mean(dtype=x.dtype)
+
+
+def _cross_correlate_fft(x, y, max_lag_neg, max_lag_pos, weighting):
+    """Computes c[k] = sum x[n + k] y[n] for k = -max_lag_neg..max_lag_pos via rfft."""
+    # Padding to max(nx, ny) + window keeps the circular wrap-around out of the window
+    n_fft = next_fast_len(max(len(x), len(y)) + max(max_lag_neg, max_lag_pos), real=True)
+    cross_spectrum = rfft(x, n_fft, workers=-1) * np.conj(rfft(y, n_fft, workers=-1))
+    if weighting == "phat":
+        # GCC-PHAT keeps only the phase, which sharpens the peak
+        cross_spectrum /= np.maximum(np.abs(cross_spectrum), np.finfo(cross_spectrum.real.dtype).tiny)
+    circular = irfft(cross_spectrum, n_fft, workers=-1)
+    return np.concatenate((circular[n_fft - max_lag_neg:], circular[:max_lag_pos + 1]))
+
+
+def cross_correlation(x, y, max_lag=None, weighting=None):
+    """
+    Computes the cross-correlation c[k] = sum x[n + k] y[n] of two signals.
+
+    Both signals are mean-removed. With the default weighting the result is
+    normalised by sqrt(sum x^2 * sum y^2), which equals n * std(x) * std(y)
+    for equal lengths. weighting="phat" applies GCC-PHAT instead. Only lags
+    in [-max_lag, max_lag] are produced; the default is every lag of the full
+    correlation. A positive peak lag means x is a delayed copy of y.
+
+    Returns (lags, correlation).
+    """
+    if weighting not in (None, "phat"):
+        raise ValueError(f"Unknown cross-correlation weighting: {weighting}")
+    x = _centered(x)
+    y = _centered(y)
+    if len(x) == 0 or len(y) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+
+    max_lag_pos = len(x) - 1
+    max_lag_neg = len(y) - 1
+    if max_lag is not None:
+        max_lag = max(int(max_lag), 0)
+        max_lag_pos = min(max_lag_pos, max_lag)
+        max_lag_neg = min(max_lag_neg, max_lag)
+
+    correlation = _cross_correlate_fft(x, y, max_lag_neg, max_lag_pos, weighting)
+    if weighting is None:
+        scale = np.sqrt(np.dot(x, x) * np.dot(y, y))
+        if scale > 0:
+            correlation = correlation / scale
+    lags = np.arange(-max_lag_neg, max_lag_pos + 1)
+    return lags, correlation
+
+
+def parabolic_peak(values, index):
+    """Refines a peak position by fitting a parabola through it and its neighbours."""
+    if index <= 0 or index >= len(values) - 1:
+        return float(index)
+    left, centre, right = values[index - 1], values[index], values[index + 1]
+    denominator = left - 2 * centre + right
+    if denominator == 0:
+        return float(index)
+    return index + 0.5 * (left - right) / denominator
+
+
+def estimate_delay(x, y, sample_rate=None, max_lag=None, weighting=None):
+    """
+    Estimates how far x lags behind y from the cross-correlation peak.
+
+    Returns a dict with the integer peak lag, the sub-sample delay in samples
+    (parabolic interpolation around the peak), the delay in seconds when a
+    sample rate is given, the peak correlation value and the (lags,
+    correlation) arrays themselves.
+    """
+    lags, correlation = cross_correlation(x, y, max_lag=max_lag, weighting=weighting)
+    if len(correlation) == 0:
+        raise ValueError("Cannot estimate delay of an empty signal")
+    peak_index = int(np.argmax(correlation))
+    delay_samples = lags[0] + parabolic_peak(correlation, peak_index)
+    return {
+        "peak_lag": int(lags[peak_index]),
+        "delay_samples": float(delay_samples),
+        "delay_seconds": delay_samples / sample_rate if sample_rate else None,
+        "peak_value": float(correlation[peak_index]),
+        "lags": lags,
+        "correlation": correlation,
+    }
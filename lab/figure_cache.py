@@ -0,0 +1,39 @@
+import streamlit as st
+
+from lab.cache import LRUByteCache, make_key
+from lab.figures import close_figure, figure_to_bytes
+
+# Default byte budget for the process-wide figure cache
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache(LRUByteCache):
+    """Thread-safe LRU cache of rendered figure bytes with a byte budget."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(max_bytes)
+
+
+# Shared by every session in the process
+figure_cache = FigureCache()
+
+
+def render_cached(key, build_figure, fmt="png", cache=figure_cache):
+    """
+    Returns rendered figure bytes for a key, calling build_figure() and
+    rendering its result only on a cache miss.
+    """
+    data = cache.get(key)
+    if data is None:
+        fig = build_figure()
+        try:
+            data = figure_to_bytes(fig, fmt)
+        finally:
+            close_figure(fig)
+        cache.put(key, data)
+    return data
+
+
+def show_cached_figure(key, build_figure):
+    """Displays a figure from the cache like st.pyplot, building it on a miss."""
+    st.image(render_cached(key, build_figure), width="stretch")
@@ -0,0 +1,145 @@
+import io
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import streamlit as st
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from lab.plotting import RENDER_DPI
+
+logger = logging.getLogger(__name__)
+
+# Figures are never shared between threads: each one is created, drawn and
+# rendered by the script thread that owns it, on an Agg canvas created in
+# that thread. Nothing here touches pyplot's global state, so sessions can
+# render concurrently without a lock.
+
+# Live figure count above which a warning is logged on every new figure
+LIVE_FIGURE_WARNING = 50
+
+# Seconds between figure count log lines, overridable with LAB_FIGURE_STATS_INTERVAL (0 turns them off)
+FIGURE_STATS_INTERVAL = float(os.environ.get("LAB_FIGURE_STATS_INTERVAL", "60"))
+
+# Figures created through new_figure and not yet closed
+_live_figures = weakref.WeakSet()
+_counters = {"created": 0, "closed": 0}
+_lock = threading.Lock()
+_reporter = None
+
+
+def _attach_thread_canvas(fig):
+    """Gives a figure an Agg canvas owned by the calling thread."""
+    canvas = FigureCanvasAgg(fig)
+    fig._lab_owner_thread = threading.get_ident()
+    return canvas
+
+
+def new_figure(nrows=1, ncols=1, figsize=None, **subplot_kw):
+    """
+    Creates a figure and its axes with the object-oriented API.
+
+    Unlike plt.subplots the figure is not registered with pyplot, so it is
+    freed as soon as it is closed or no longer referenced. Extra keyword
+    arguments are passed to Figure.subplots.
+
+    Returns (fig, axes).
+    """
+    _start_stats_reporter()
+    fig = Figure(figsize=figsize)
+    _attach_thread_canvas(fig)
+    axes = fig.subplots(nrows, ncols, **subplot_kw)
+    with _lock:
+        _live_figures.add(fig)
+        _counters["created"] += 1
+        live = len(_live_figures)
+    if live > LIVE_FIGURE_WARNING:
+        logger.warning("%d matplotlib figures are open", live)
+    return fig, axes
+
+
+def close_figure(fig):
+    """Releases a figure's artists and stops tracking it."""
+    fig.clear()
+    with _lock:
+        if fig in _live_figures:
+            _live_figures.discard(fig)
+            _counters["closed"] += 1
+
+
+@contextmanager
+def managed_figure(nrows=1, ncols=1, figsize=None, **subplot_kw):
+    """Context manager around new_figure that closes the figure on exit."""
+    fig, axes = new_figure(nrows, ncols, figsize=figsize, **subplot_kw)
+    try:
+        yield fig, axes
+    finally:
+        close_figure(fig)
+
+
+def live_figure_count():
+    """Returns the number of figures created through new_figure that are still open."""
+    with _lock:
+        return len(_live_figures)
+
+
+def figure_stats():
+    """Returns live, created and closed figure counts, plus pyplot's own registry size."""
+    with _lock:
+        stats = {"live": len(_live_figures), **_counters}
+    # Only look at pyplot if something imported it; importing it here would select a backend
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    stats["pyplot_open"] = len(pyplot.get_fignums()) if pyplot else 0
+    return stats
+
+
+def log_figure_stats():
+    """Logs the figure counts, as a warning once more than LIVE_FIGURE_WARNING figures are open."""
+    stats = figure_stats()
+    level = logging.WARNING if stats["live"] > LIVE_FIGURE_WARNING else logging.INFO
+    logger.log(level, "figures: live=%(live)d created=%(created)d closed=%(closed)d pyplot_open=%(pyplot_open)d", stats)
+
+
+def _start_stats_reporter():
+    """Starts the daemon thread that logs the figure counts every FIGURE_STATS_INTERVAL seconds, once per process."""
+    global _reporter
+    if FIGURE_STATS_INTERVAL <= 0 or _reporter is not None:
+        return
+    with _lock:
+        if _reporter is not None:
+            return
+
+        def report():
+            while True:
+                time.sleep(FIGURE_STATS_INTERVAL)
+                log_figure_stats()
+
+        _reporter = threading.Thread(target=report, name="lab-figure-stats", daemon=True)
+        _reporter.start()
+
+
+def figure_to_bytes(fig, fmt="png", dpi=RENDER_DPI):
+    """
+    Renders a figure to PNG or SVG bytes with st.pyplot's savefig settings,
+    on the calling thread's canvas instead of pyplot's.
+    """
+    if getattr(fig, "_lab_owner_thread", None) != threading.get_ident():
+        # Figures built elsewhere (or handed over from another thread) get a
+        # fresh canvas so no renderer is shared between threads
+        _attach_thread_canvas(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def show_figure(fig):
+    """Displays a figure like st.pyplot, without going through pyplot, and closes it."""
+    try:
+        st.image(figure_to_bytes(fig), width="stretch")
+    finally:
+        close_figure(fig)
@@ -0,0 +1,137 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import signal
+
+from lab.audio_io import as_signal
+
+# Filter band types understood by design_sos, as scipy btype names
+BAND_TYPES = ("low", "high", "band", "bandstop")
+
+# Samples filtered per block by the streaming filters
+FILTER_BLOCK = 65536
+
+
+def _normalize_cutoffs(cutoffs):
+    """Returns cutoffs as a float or a tuple of floats, so designs hash consistently."""
+    if np.ndim(cutoffs) == 0:
+        return float(cutoffs)
+    return tuple(float(cutoff) for cutoff in cutoffs)
+
+
+@lru_cache(maxsize=64)
+def _design_sos(btype, order, cutoffs, fs):
+    """Returns a cached, read-only Butterworth design in second-order sections."""
+    sos = signal.butter(order, cutoffs, btype=btype, output='sos', fs=fs)
+    sos.setflags(write=False)
+    return sos
+
+
+def design_sos(btype, order, cutoffs, fs):
+    """
+    Designs a digital Butterworth filter as second-order sections.
+
+    btype is one of BAND_TYPES; cutoffs are in Hz, a pair for "band" and
+    "bandstop". Designs are cached by (btype, order, cutoffs, fs), so the
+    returned array is read-only.
+
+    Raises ValueError for cutoffs outside (0, fs / 2).
+    """
+    if btype not in BAND_TYPES:
+        raise ValueError(f"Unknown filter type: {btype}")
+    cutoffs = _normalize_cutoffs(cutoffs)
+    edges = np.atleast_1d(cutoffs)
+    if np.any(edges <= 0) or np.any(edges >= fs / 2):
+        raise ValueError(f"Cutoff frequencies must lie between 0 and {fs / 2:g} Hz")
+    if len(edges) == 2 and edges[0] >= edges[1]:
+        raise ValueError("The lower cutoff must be below the upper cutoff")
+    return _design_sos(btype, int(order), cutoffs, float(fs))
+
+
+def apply_sos(sos, x, zero_phase=True, axis=-1):
+    """Filters a signal forward and backward (zero-phase) or causally with second-order sections."""
+    # scipy's sosfilt needs a writable array, and cached designs are read-only
+    sos = np.array(sos)
+    if zero_phase:
+        return signal.sosfiltfilt(sos, x, axis=axis)
+    return signal.sosfilt(sos, x, axis=axis)
+
+
+def filter_signal(x, btype, order, cutoffs, fs, zero_phase=True, axis=-1):
+    """Designs (or reuses) a Butterworth filter and applies it, see design_sos and apply_sos."""
+    return apply_sos(design_sos(btype, order, cutoffs, fs), x, zero_phase=zero_phase, axis=axis)
+
+
+def frequency_response(sos, fs, num_points=2000):
+    """Returns (freqs, h), the complex response of a filter at num_points frequencies in Hz."""
+    return signal.sosfreqz(sos, worN=num_points, fs=fs)
+
+
+def _pad_length(sos):
+    """Returns the odd-extension length sosfiltfilt uses for a filter."""
+    taps = 2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    return 3 * taps
+
+
+def stream_sos(sos, x, zero_phase=True, block_size=FILTER_BLOCK, out=None):
+    """
+    Filters a 1-D signal block by block into out, carrying the sections'
+    state across blocks, so temporaries stay proportional to block_size.
+
+    The causal pass matches sosfilt. The zero-phase pass matches sosfiltfilt:
+    a forward pass over the oddly extended signal, then a backward pass over
+    its result in place.
+
+    Yields (start, stop, fraction) after each block, where out[start:stop]
+    holds final samples and fraction is the share of work done. out
+    defaults to a new array of x's float type.
+    """
+    sos = np.array(sos)
+    x = as_signal(x)
+    n = len(x)
+    if out is None:
+        out = np.empty(n, dtype=np.result_type(x.dtype, np.float32))
+    if not zero_phase:
+        state = np.zeros((len(sos), 2))
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            out[start:stop], state = signal.sosfilt(sos, x[start:stop], zi=state)
+            yield start, stop, stop / n
+        return
+
+    pad = _pad_length(sos)
+    if n <= pad:
+        raise ValueError(f"The signal needs more than {pad} samples for zero-phase filtering")
+    left = 2 * x[0] - x[pad:0:-1]
+    right = 2 * x[-1] - x[-2:-pad - 2:-1]
+    zi = signal.sosfilt_zi(sos)
+
+    # Forward pass; the extensions' outputs are only needed at the right end
+    _, state = signal.sosfilt(sos, left, zi=zi * left[0])
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        out[start:stop], state = signal.sosfilt(sos, x[start:stop], zi=state)
+        yield start, start, stop / (2 * n)
+    right, _ = signal.sosfilt(sos, right, zi=state)
+
+    # Backward pass, from the end of the right extension towards the start
+    _, state = signal.sosfilt(sos, right[::-1], zi=zi * right[-1])
+    for stop in range(n, 0, -block_size):
+        start = max(stop - block_size, 0)
+        filtered, state = signal.sosfilt(sos, out[start:stop][::-1], zi=state)
+        out[start:stop] = filtered[::-1]
+        yield start, stop, 1 - start / (2 * n)
+
+
+def apply_sos_blocks(sos, x, zero_phase=True, block_size=FILTER_BLOCK, progress=None):
+    """
+    Filters a 1-D signal with stream_sos and returns the result. progress,
+    if given, is called with (start, stop, fraction) after each block.
+    """
+    x = as_signal(x)
+    out = np.empty(len(x), dtype=np.result_type(x.dtype, np.float32))
+    for start, stop, fraction in stream_sos(sos, x, zero_phase=zero_phase, block_size=block_size, out=out):
+        if progress is not None:
+            progress(start, stop, fraction)
+    return out
+
@@ -0,0 +1,180 @@
+import hashlib
+import os
+
+import numpy as np
+import scipy.io
+import streamlit as st
+
+from lab.audio_io import MMAP_MIN_BYTES, map_wav, read_audio, read_audio_with_progress, release_spill, spill_to_disk
+from lab.cache import LRUByteCache
+
+# Byte budget for decoded uploads, overridable with LAB_INGEST_CACHE_MB
+INGEST_CACHE_BYTES = int(os.environ.get("LAB_INGEST_CACHE_MB", "256")) * 1024 * 1024
+
+# Disk budget for memory-mapped uploads, overridable with LAB_MAPPED_CACHE_MB
+MAPPED_CACHE_BYTES = int(os.environ.get("LAB_MAPPED_CACHE_MB", "2048")) * 1024 * 1024
+
+# Bytes hashed per update when fingerprinting a file object
+HASH_BLOCK = 1024 * 1024
+
+# Upload digests remembered per session
+SESSION_DIGESTS = 32
+
+
+def _nbytes(value):
+    """Returns the memory held by the arrays in a decoded value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    return 0
+
+
+def _freeze(value):
+    """Marks the arrays in a decoded value read-only, since every session shares them."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    return value
+
+
+class IngestCache(LRUByteCache):
+    """Thread-safe LRU cache of decoded uploads, budgeted by array bytes."""
+
+    @staticmethod
+    def _sizeof(data):
+        return _nbytes(data)
+
+
+class MappedCache(LRUByteCache):
+    """
+    Thread-safe LRU cache of memory-mapped uploads by content digest,
+    budgeted by file size. Evicting an upload deletes its spilled file.
+    """
+
+    @staticmethod
+    def _sizeof(data):
+        return data.file_bytes
+
+    def _evicted(self, key, data):
+        release_spill(key)
+
+
+# Shared by every session in the process
+ingest_cache = IngestCache(INGEST_CACHE_BYTES)
+mapped_cache = MappedCache(MAPPED_CACHE_BYTES)
+
+
+def content_digest(source):
+    """
+    Returns the SHA-256 hex digest of a file's bytes. source is bytes, a
+    path, or a file object such as a Streamlit upload, which is rewound.
+    A Streamlit upload is hashed once per session, by its file_id, so
+    reruns do not hash it again.
+    """
+    file_id = getattr(source, "file_id", None)
+    if file_id is None:
+        return _hash_content(source)
+    digests = st.session_state.setdefault("_lab_upload_digests", {})
+    digest = digests.get(file_id)
+    if digest is None:
+        digest = digests[file_id] = _hash_content(source)
+        while len(digests) > SESSION_DIGESTS:
+            del digests[next(iter(digests))]
+    return digest
+
+
+def _hash_content(source):
+    """Returns the SHA-256 hex digest of a file's bytes, see content_digest."""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            for block in iter(lambda: file.read(HASH_BLOCK), b""):
+                digest.update(block)
+    elif hasattr(source, "getbuffer"):
+        # In-memory uploads are hashed without copying
+        digest.update(source.getbuffer())
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_BLOCK), b""):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def ingest(source, kind, decode, *options, cache=ingest_cache):
+    """
+    Returns decode(source), decoding only the first time a given file
+    content is seen with the given kind and options in this process.
+
+    The result's arrays are read-only because they are shared across
+    reruns and sessions.
+    """
+    key = (kind, content_digest(source), options)
+    value = cache.get(key)
+    if value is None:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        value = _freeze(decode(source))
+        cache.put(key, value)
+    return value
+
+
+def ingest_audio(source, mono=True, normalize=True, progress=True):
+    """Returns (audio, sample_rate) for an audio file, see read_audio, decoding each content once."""
+    reader = read_audio_with_progress if progress else read_audio
+    return ingest(source, "audio", lambda file: reader(file, mono=mono, normalize=normalize), mono, normalize)
+
+
+def ingest_mat(source):
+    """Returns the variables of a MATLAB .mat file, see scipy.io.loadmat, decoding each content once."""
+    return ingest(source, "mat", scipy.io.loadmat)
+
+
+def ingest_mapped(source, mono=True, normalize=True, cache=mapped_cache):
+    """
+    Returns (audio, sample_rate) for a PCM WAV file as MappedAudio, without
+    decoding it into memory. An upload is written to a temporary file once
+    per content, kept while it stays in cache; mixing down and normalizing
+    are applied lazily, and the peak is found with one blockwise pass per
+    content and options.
+
+    Raises ValueError if the file is not a WAV that can be memory-mapped.
+    """
+    digest = content_digest(source)
+    audio = cache.get(digest)
+    if audio is None:
+        if isinstance(source, (str, os.PathLike)):
+            audio = map_wav(source, key=digest)
+        else:
+            try:
+                audio = map_wav(spill_to_disk(source, digest), key=digest)
+            except ValueError:
+                release_spill(digest)
+                raise
+        cache.put(digest, audio)
+    return audio.view(mono, normalize), audio.sample_rate
+
+
+def ingest_upload(source, mono=True, normalize=True):
+    """
+    Returns (audio, sample_rate) for an uploaded audio file: memory-mapped
+    with ingest_mapped if it is a WAV of at least MMAP_MIN_BYTES, otherwise
+    decoded with ingest_audio.
+    """
+    if getattr(source, "size", 0) >= MMAP_MIN_BYTES:
+        try:
+            return ingest_mapped(source, mono=mono, normalize=normalize)
+        except ValueError:
+            # Compressed or 24-bit files cannot be mapped, so they are decoded
+            pass
+    return ingest_audio(source, mono=mono, normalize=normalize)
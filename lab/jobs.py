@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# Jobs running at once across every session, overridable with LAB_JOB_WORKERS
+JOB_MAX_WORKERS = int(os.environ.get("LAB_JOB_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Jobs waiting or running at once across every session
+JOB_MAX_PENDING = 4 * JOB_MAX_WORKERS
+
+# Seconds a finished job's result is kept for a session that has not collected it
+JOB_RESULT_TTL = 600
+
+# Seconds between progress refreshes while a job runs
+JOB_POLL_INTERVAL = 0.5
+
+# Jobs run on threads: SciPy's filtering and FFT routines release the GIL,
+# and large arrays reach the workers without being pickled
+_executor = ThreadPoolExecutor(max_workers=JOB_MAX_WORKERS, thread_name_prefix="lab-job")
+_jobs = {}
+_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled."""
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the process-wide job limit is reached."""
+
+
+class Job:
+    """A function running on the shared pool, with progress and cooperative cancellation."""
+
+    def __init__(self, key, func, args, kwargs):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.progress = 0.0
+        self.status = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self.future = None
+
+    def report(self, fraction, status=None):
+        """
+        Records progress, and optionally a status shown after the progress
+        label; raises JobCancelled if the job was cancelled, so every report
+        is a cancellation point.
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if status is not None:
+            self.status = status
+
+    def cancel(self):
+        """Asks the job to stop at its next report, or before it starts."""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            # It will never run, so its arguments can go now
+            self._func = self._args = self._kwargs = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        """Returns the job's result, re-raising its exception."""
+        return self.future.result()
+
+    def _run(self):
+        try:
+            if self._cancel.is_set():
+                raise JobCancelled()
+            return self._func(self, *self._args, **self._kwargs)
+        finally:
+            # The arguments can hold whole recordings; an uncollected result should not pin them too
+            self._func = self._args = self._kwargs = None
+            self.finished_at = time.monotonic()
+
+
+def _expire_jobs():
+    """Drops finished jobs that no session collected within JOB_RESULT_TTL. Call with _lock held."""
+    now = time.monotonic()
+    for job_id in [job_id for job_id, job in _jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > JOB_RESULT_TTL]:
+        del _jobs[job_id]
+
+
+def _session_jobs():
+    """Returns this session's mapping of job names to job ids."""
+    return st.session_state.setdefault("_lab_jobs", {})
+
+
+def submit_job(name, key, func, *args, **kwargs):
+    """
+    Runs func(job, *args, **kwargs) on the shared pool as this session's job
+    called name, and returns the Job. func should call job.report(fraction)
+    as it goes; that is also where cancellation takes effect.
+
+    key identifies the job's inputs: a running job with the same key is
+    returned as is, and one with a different key is cancelled first.
+
+    Raises JobQueueFullError when JOB_MAX_PENDING jobs are already queued
+    or running.
+    """
+    job = get_job(name)
+    if job is not None and job.key == key and not job.cancelled:
+        return job
+    cancel_job(name)
+    with _lock:
+        _expire_jobs()
+        pending = sum(1 for existing in _jobs.values() if not existing.future.done())
+        if pending >= JOB_MAX_PENDING:
+            raise JobQueueFullError("The server is busy, please try again in a moment.")
+        job = Job(key, func, args, kwargs)
+        job.future = _executor.submit(job._run)
+        _jobs[job.id] = job
+    _session_jobs()[name] = job.id
+    return job
+
+
+def get_job(name):
+    """Returns this session's job called name, or None."""
+    job_id = _session_jobs().get(name)
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def cancel_job(name):
+    """Cancels and forgets this session's job called name, if any."""
+    job_id = _session_jobs().pop(name, None)
+    with _lock:
+        job = _jobs.pop(job_id, None)
+    if job is not None:
+        job.cancel()
+
+
+def cancel_stale_job(name, key):
+    """Cancels this session's job called name if it was started for other inputs than key."""
+    job = get_job(name)
+    if job is not None and job.key != key:
+        cancel_job(name)
+
+
+def collect_job(name):
+    """
+    Hands a finished job's result over to the session and forgets the job.
+
+    Returns (True, result) once the job has finished, re-raising its
+    exception, or (False, None) while it runs or if there is none.
+    """
+    job = get_job(name)
+    if job is None or not job.done():
+        return False, None
+    cancel_job(name)
+    return True, job.result()
+
+
+def show_job_progress(name, label):
+    """
+    Shows a progress bar and a Cancel button while this session's job called
+    name runs, refreshing on its own, and reruns the page when it finishes.
+    Without such a job nothing is shown and nothing polls.
+    """
+    if get_job(name) is None:
+        return
+
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def job_progress():
+        job = get_job(name)
+        if job is None:
+            return
+        if job.done():
+            st.rerun()
+        st.progress(job.progress, text=f"{label} {job.status}" if job.status else label)
+        if st.button("Cancel", key=f"cancel_{name}"):
+            cancel_job(name)
+            st.rerun()
+
+    job_progress()
@@ -0,0 +1,68 @@
+import io
+import os
+
+import numpy as np
+import soundfile as sf
+import streamlit as st
+
+from lab.audio_io import BLOCK_FRAMES, as_signal
+from lab.cache import LRUByteCache, make_key
+from lab.resampling import resample
+
+# Playback encodings: soundfile format, subtype and MIME type
+ENCODINGS = {
+    "wav": ("WAV", "PCM_16", "audio/wav"),
+    "flac": ("FLAC", "PCM_16", "audio/flac"),
+    "ogg": ("OGG", "VORBIS", "audio/ogg"),
+}
+
+# Encoding used by play_audio, overridable with LAB_AUDIO_FORMAT
+PLAYBACK_FORMAT = os.environ.get("LAB_AUDIO_FORMAT", "wav")
+
+# Default byte budget for the process-wide encoded audio cache
+AUDIO_CACHE_BYTES = 64 * 1024 * 1024
+
+# Shared by every session in the process
+audio_cache = LRUByteCache(AUDIO_CACHE_BYTES)
+
+
+def encode_audio(audio, sample_rate, fmt="wav", preview_rate=None):
+    """
+    Encodes a float signal in [-1, 1] as WAV, FLAC or Ogg Vorbis bytes.
+
+    Samples are clipped first, since filtered and reconstructed signals can
+    overshoot. preview_rate, if below sample_rate, resamples the signal
+    down for a smaller preview.
+    """
+    if fmt not in ENCODINGS:
+        raise ValueError(f"Unknown audio format: {fmt}")
+    file_format, subtype, _ = ENCODINGS[fmt]
+    if preview_rate and preview_rate < sample_rate:
+        audio, sample_rate = resample(np.asarray(audio, dtype=np.float32), sample_rate, preview_rate, axis=0)
+    audio = as_signal(audio)
+    buffer = io.BytesIO()
+    channels = 1 if audio.ndim == 1 else audio.shape[1]
+    with sf.SoundFile(buffer, "w", int(round(sample_rate)), channels, subtype=subtype, format=file_format) as file:
+        # Written block by block, so memory-mapped audio is never read whole
+        for start in range(0, len(audio), BLOCK_FRAMES):
+            file.write(np.clip(np.asarray(audio[start:start + BLOCK_FRAMES], dtype=np.float32), -1.0, 1.0))
+    return buffer.getvalue()
+
+
+def encoded_audio(audio, sample_rate, fmt=PLAYBACK_FORMAT, preview_rate=None, cache=audio_cache):
+    """
+    Returns (data, mime_type) for a signal, encoding it only the first time
+    its content is seen with these settings, see encode_audio.
+    """
+    key = make_key("audio", as_signal(audio), sample_rate, fmt, preview_rate)
+    data = cache.get(key)
+    if data is None:
+        data = encode_audio(audio, sample_rate, fmt=fmt, preview_rate=preview_rate)
+        cache.put(key, data)
+    return data, ENCODINGS[fmt][2]
+
+
+def play_audio(audio, sample_rate, fmt=PLAYBACK_FORMAT, preview_rate=None):
+    """Shows an audio player for a signal, served as raw encoded bytes from the cache."""
+    data, mime_type = encoded_audio(audio, sample_rate, fmt=fmt, preview_rate=preview_rate)
+    st.audio(data, format=mime_type)
@@ -0,0 +1,97 @@
+import numpy as np
+
+# Resolution st.pyplot renders figures at
+RENDER_DPI = 200
+
+# Points kept per horizontal pixel of the axes
+POINTS_PER_PIXEL = 2
+
+
+def axis_pixel_width(ax, dpi=RENDER_DPI):
+    """Returns the rendered width of an axes in pixels."""
+    fig = ax.get_figure()
+    return max(int(ax.get_position().width * fig.get_figwidth() * dpi), 1)
+
+
+def minmax_decimate(x, y, n_out):
+    """
+    Downsamples a series to about n_out points by keeping the minimum and
+    maximum of every bin, so peaks survive the decimation.
+
+    Returns (x, y).
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    n_bins = max(n_out // 2, 1)
+    if n <= n_out or n_bins >= n:
+        return x, y
+
+    # Pad to a whole number of equally sized bins by repeating the last sample
+    bin_size = -(-n // n_bins)
+    n_bins = -(-n // bin_size)
+    padded = np.pad(y, (0, n_bins * bin_size - n), mode='edge').reshape(n_bins, bin_size)
+    offsets = np.arange(n_bins) * bin_size
+    min_index = np.minimum(offsets + np.argmin(padded, axis=1), n - 1)
+    max_index = np.minimum(offsets + np.argmax(padded, axis=1), n - 1)
+
+    # Keep each bin's extremes in time order, plus the end points
+    index = np.concatenate(([0], np.minimum(min_index, max_index), np.maximum(min_index, max_index), [n - 1]))
+    index = np.unique(index)
+    return x[index], y[index]
+
+
+def lttb_decimate(x, y, n_out):
+    """
+    Downsamples a series to n_out points with Largest-Triangle-Three-Buckets,
+    which keeps the points that contribute most to the visual shape.
+
+    Returns (x, y).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    # Interior buckets; the first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    index = np.empty(n_out, dtype=int)
+    index[0] = 0
+    index[-1] = n - 1
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        prev_x, prev_y = x[index[i]], y[index[i]]
+        areas = np.abs((prev_x - avg_x) * (y[start:end] - prev_y) - (prev_x - x[start:end]) * (avg_y - prev_y))
+        index[i + 1] = start + int(np.argmax(areas))
+    return x[index], y[index]
+
+
+def decimate(x, y, n_out, method="minmax"):
+    """Downsamples a series to about n_out points with the given method."""
+    if method == "minmax":
+        return minmax_decimate(x, y, n_out)
+    elif method == "lttb":
+        return lttb_decimate(x, y, n_out)
+    raise ValueError(f"Unknown decimation method: {method}")
+
+
+def plot_decimated(ax, x, y, *args, method="minmax", **kwargs):
+    """
+    Plots a series on an axes after decimating it to about twice the axes
+    pixel width. Accepts the same extra arguments as Axes.plot.
+
+    Raises ValueError if x and y differ in length.
+    """
+    if len(x) != len(y):
+        raise ValueError(f"x and y must have the same length, got {len(x)} and {len(y)}")
+    n_out = POINTS_PER_PIXEL * axis_pixel_width(ax)
+    x, y = decimate(x, y, n_out, method=method)
+    return ax.plot(x, y, *args, **kwargs)
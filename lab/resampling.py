@@ -0,0 +1,200 @@
+from fractions import Fraction
+
+import numpy as np
+from scipy import signal
+from scipy.signal import resample_poly
+
+# Largest up/down factor used to approximate a resampling ratio
+MAX_DENOMINATOR = 1000
+
+# Reconstruction kernels understood by reconstruct()
+RECONSTRUCTION_KERNELS = ("linear", "zoh", "sinc", "fft")
+
+# Half-length, in samples of the sampled signal, of the windowed-sinc kernel
+SINC_HALF_WIDTH = 8
+
+# Output samples evaluated per block by the windowed-sinc kernel, small
+# enough for the block's weight matrix to stay in cache
+SINC_BLOCK = 4096
+
+
+def rational_ratio(target_rate, source_rate, max_denominator=MAX_DENOMINATOR):
+    """
+    Approximates target_rate / source_rate by up / down with both factors at
+    most max_denominator. Integer rates with a small ratio are exact.
+
+    Raises ValueError if the ratio is outside [1 / max_denominator,
+    max_denominator]; see resampling_stages for such ratios.
+
+    Returns (up, down).
+    """
+    if target_rate <= 0 or source_rate <= 0:
+        raise ValueError("Sampling rates must be positive")
+    ratio = Fraction(target_rate) / Fraction(source_rate)
+    if not Fraction(1, max_denominator) <= ratio <= max_denominator:
+        raise ValueError(f"The resampling ratio {float(ratio):.6g} is outside [1/{max_denominator}, {max_denominator}]")
+    approx = ratio.limit_denominator(max_denominator)
+    # limit_denominator bounds only the denominator, so bound up-sampling as well
+    if approx.numerator > max_denominator:
+        approx = 1 / (1 / ratio).limit_denominator(max_denominator)
+    return approx.numerator, approx.denominator
+
+
+def resampling_stages(target_rate, source_rate, max_denominator=MAX_DENOMINATOR):
+    """
+    Splits target_rate / source_rate into polyphase stages whose factors are
+    all at most max_denominator: whole factors of max_denominator first, then
+    the rational_ratio of the remainder.
+
+    Returns a list of (up, down).
+    """
+    if target_rate <= 0 or source_rate <= 0:
+        raise ValueError("Sampling rates must be positive")
+    stages = []
+    rate = Fraction(source_rate)
+    while Fraction(target_rate) / rate < Fraction(1, max_denominator):
+        stages.append((1, max_denominator))
+        rate /= max_denominator
+    while Fraction(target_rate) / rate > max_denominator:
+        stages.append((max_denominator, 1))
+        rate *= max_denominator
+    stages.append(rational_ratio(target_rate, rate, max_denominator))
+    return stages
+
+
+def resampled_rate(source_rate, target_rate, max_denominator=MAX_DENOMINATOR):
+    """Returns the rate resample actually reaches for target_rate, see resampling_stages."""
+    rate = float(source_rate)
+    for up, down in resampling_stages(target_rate, source_rate, max_denominator):
+        rate = rate * up / down
+    return rate
+
+
+def resample(x, source_rate, target_rate, max_denominator=MAX_DENOMINATOR, axis=-1):
+    """
+    Resamples a signal to a new rate with polyphase filtering, which
+    band-limits it to the lower of the two Nyquist frequencies. Ratios
+    beyond max_denominator run as several stages, see resampling_stages.
+
+    Returns (resampled, actual_rate), where actual_rate is the rate implied
+    by the rational approximation of the ratio.
+    """
+    x = np.asarray(x)
+    rate = float(source_rate)
+    for up, down in resampling_stages(target_rate, source_rate, max_denominator):
+        if up != down:
+            x = resample_poly(x, up, down, axis=axis)
+            rate = rate * up / down
+    return x, rate
+
+
+def sample_positions(num_samples, source_rate, target_rate):
+    """Returns the positions, in source samples, of the instants k / target_rate."""
+    count = int(np.ceil(num_samples * target_rate / source_rate))
+    positions = np.arange(count) * (source_rate / target_rate)
+    return positions[positions <= num_samples - 1]
+
+
+def point_sample(x, source_rate, target_rate):
+    """
+    Samples a signal at exactly target_rate without an anti-aliasing filter,
+    interpolating linearly between the source samples. Rates above the source
+    rate are allowed.
+
+    Returns (positions, samples), with positions in source samples.
+    """
+    x = np.asarray(x)
+    positions = sample_positions(len(x), source_rate, target_rate)
+    return positions, np.interp(positions, np.arange(len(x)), x)
+
+
+def sample_signal(x, source_rate, target_rate, anti_alias=False):
+    """
+    Samples a signal at target_rate.
+
+    Without anti_alias the signal is point-sampled, so components above
+    target_rate / 2 alias. With anti_alias it is resampled with polyphase
+    filters, which removes them first.
+
+    Returns (samples, step), where step is the sample spacing in source samples.
+    """
+    x = np.asarray(x)
+    if anti_alias:
+        samples, actual_rate = resample(x, source_rate, target_rate)
+        return samples, source_rate / actual_rate
+    _, samples = point_sample(x, source_rate, target_rate)
+    return samples, source_rate / target_rate
+
+
+def _reconstruct_sinc(samples, step, num_samples, half_width):
+    """Evaluates a Hann-windowed sinc interpolator on the source grid, block by block."""
+    reconstructed = np.empty(num_samples)
+    # Output n uses samples k = floor(n / step) + m for the taps m below
+    taps = np.arange(-half_width + 1, half_width + 1)
+    tap_signs = np.where(taps % 2 == 0, 1.0, -1.0)
+    tap_cos = np.cos(np.pi * taps / half_width)
+    tap_sin = np.sin(np.pi * taps / half_width)
+
+    # Zero-pad so every tap of every output has a sample; row r of windows
+    # holds samples r - half_width + 1 .. r + half_width of the padded signal
+    last_base = int((num_samples - 1) / step)
+    right = max(half_width, last_base + half_width - len(samples) + 1)
+    padded = np.pad(samples, (half_width, right))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half_width)
+
+    for start in range(0, num_samples, SINC_BLOCK):
+        position = np.arange(start, min(start + SINC_BLOCK, num_samples)) / step
+        base = np.floor(position).astype(int)
+        frac = position - base
+        distance = frac[:, None] - taps
+        # sin(pi (frac - m)) = (-1)^m sin(pi frac), and the Hann window
+        # cos^2(pi d / 2K) = (1 + cos(pi frac / K - pi m / K)) / 2 splits into
+        # per-output and per-tap factors, so only one division runs per tap
+        sinc_numerator = np.sin(np.pi * frac)[:, None] * tap_signs
+        window = 0.5 * (1 + np.cos(np.pi * frac / half_width)[:, None] * tap_cos
+                        + np.sin(np.pi * frac / half_width)[:, None] * tap_sin)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = sinc_numerator / (np.pi * distance) * window
+        # Outputs that fall on a sample take it unchanged
+        on_sample = frac == 0
+        weights[on_sample] = 0.0
+        weights[on_sample, half_width - 1] = 1.0
+        reconstructed[start:start + len(position)] = np.einsum('ij,ij->i', weights, windows[base + 1])
+    return reconstructed
+
+
+def reconstruct(samples, step, num_samples, kernel="linear", half_width=SINC_HALF_WIDTH):
+    """
+    Reconstructs a uniformly sampled signal on the source grid 0..num_samples-1.
+
+    step is the sample spacing in source samples. kernel is one of
+    "linear" (interpolation), "zoh" (zero-order hold), "sinc" (Hann-windowed
+    sinc, 2 * half_width taps) or "fft" (band-limited Fourier interpolation,
+    which treats the samples as one period).
+    """
+    samples = np.asarray(samples, dtype=float)
+    if len(samples) == 0:
+        return np.zeros(num_samples)
+    if kernel == "linear":
+        return np.interp(np.arange(num_samples), np.arange(len(samples)) * step, samples)
+    elif kernel == "zoh":
+        index = np.minimum((np.arange(num_samples) / step).astype(int), len(samples) - 1)
+        return samples[index]
+    elif kernel == "sinc":
+        return _reconstruct_sinc(samples, step, num_samples, half_width)
+    elif kernel == "fft":
+        # Zero-padding (or truncating) the spectrum to the source length interpolates
+        num_out = max(int(round(len(samples) * step)), 1)
+        reconstructed = signal.resample(samples, num_out)[:num_samples]
+        return np.pad(reconstructed, (0, num_samples - len(reconstructed)), mode='edge')
+    raise ValueError(f"Unknown reconstruction kernel: {kernel}")
+
+
+def sample_and_reconstruct(x, source_rate, target_rate, anti_alias=False, kernel="linear"):
+    """
+    Samples a signal at target_rate and reconstructs it on the original grid,
+    see sample_signal and reconstruct.
+    """
+    x = np.asarray(x)
+    samples, step = sample_signal(x, source_rate, target_rate, anti_alias=anti_alias)
+    return reconstruct(samples, step, len(x), kernel=kernel)
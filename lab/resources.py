@@ -0,0 +1,71 @@
+import mmap
+import os
+import threading
+
+from lab.chrome import ROOT_DIR
+from lab.ingest import ingest_audio, ingest_mat
+
+# Bundled assets by name, relative to the repository root
+RESOURCES = {
+    "lti_audio": "Media/LTI_Audio.wav",
+    "sampling_audio": "Media/audio2 (2).wav",
+    "ecg_sample": "Resources/ECG_sample_sig.mat",
+    "lti_sample_audio": "Resources/LTI_Sample_Audio.wav",
+    "sampling_sample_audio": "Resources/Sampling_Thm_Audio.wav",
+}
+
+# Every session shares these, read-only: the memory maps of the raw files
+# and the decoded arrays, which are kept for the life of the process
+_maps = {}
+_decoded = {}
+_lock = threading.Lock()
+
+
+def resource_path(name):
+    """Returns the absolute path of a bundled resource."""
+    if name not in RESOURCES:
+        raise KeyError(f"Unknown resource: {name}")
+    return os.path.join(ROOT_DIR, RESOURCES[name])
+
+
+def resource_view(name):
+    """Returns a read-only memoryview of a resource's bytes, mapped once per process."""
+    with _lock:
+        view = _maps.get(name)
+        if view is None:
+            with open(resource_path(name), "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                # mmap cannot map an empty file
+                view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b"")
+            _maps[name] = view
+        return view
+
+
+def resource_bytes(name):
+    """Returns a copy of a resource's bytes, for handing to st.download_button on click."""
+    return resource_view(name).tobytes()
+
+
+def _decoded_resource(name, kind, decode):
+    """Returns a resource decoded once per process with decode(path)."""
+    with _lock:
+        value = _decoded.get((name, kind))
+    if value is None:
+        # Decoding through the ingest cache means an upload of the same file reuses it
+        value = decode(resource_path(name))
+        with _lock:
+            value = _decoded.setdefault((name, kind), value)
+    return value
+
+
+def resource_audio(name, mono=True, normalize=True):
+    """Returns (audio, sample_rate) for a bundled audio file, see read_audio; the array is read-only."""
+    return _decoded_resource(
+        name, ("audio", mono, normalize),
+        lambda path: ingest_audio(path, mono=mono, normalize=normalize, progress=False),
+    )
+
+
+def resource_mat(name):
+    """Returns the variables of a bundled .mat file, see scipy.io.loadmat; the arrays are read-only."""
+    return _decoded_resource(name, "mat", ingest_mat)
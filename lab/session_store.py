@@ -0,0 +1,279 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from lab.audio_io import MappedAudio
+
+# Resident bytes of session arrays across every session, overridable with LAB_SESSION_STORE_MB
+SESSION_STORE_BYTES = int(os.environ.get("LAB_SESSION_STORE_MB", "1024")) * 1024 * 1024
+
+# Storage for session arrays: "float32", or "int16" with a per-array scale
+SESSION_STORAGE = os.environ.get("LAB_SESSION_STORAGE", "float32")
+
+# Whether arrays evicted past the budget are spilled to disk (else dropped)
+SESSION_SPILL = os.environ.get("LAB_SESSION_SPILL", "1") != "0"
+
+# Seconds after which an idle session's arrays are dropped, overridable with LAB_SESSION_TTL
+SESSION_TTL = int(os.environ.get("LAB_SESSION_TTL", "3600"))
+
+# Seconds a session the runtime no longer reports as active keeps its arrays, for reconnects
+SESSION_GRACE = 60
+
+# Seconds between sweeps for ended sessions
+PRUNE_INTERVAL = 60
+
+
+class _Entry:
+    """One stored array: in memory, being spilled, or spilled to a .npy file."""
+
+    def __init__(self, data, scale):
+        self.data = data
+        self.scale = scale
+        self.path = None
+        self.spilling = False
+        self.nbytes = data.nbytes
+        self.last_used = time.monotonic()
+        # Read-only arrays are shared from the ingest cache or the resource
+        # registry, so evicting them would free nothing
+        self.owned = isinstance(data, np.ndarray) and data.flags.writeable
+
+
+def _buffer_id(array):
+    """Returns an id shared by arrays that view the same memory."""
+    while isinstance(array, np.ndarray) and array.base is not None:
+        array = array.base
+    return id(array)
+
+
+class SessionStore:
+    """
+    Process-wide store of per-session arrays with a resident byte budget.
+
+    Arrays are kept as float32, or as int16 plus a scale. Past the budget
+    the least recently used arrays are spilled to memory-mapped files on
+    disk, or dropped when spilling is off; only arrays the store owns
+    exclusively are evicted. Arrays several sessions share (such as a
+    cached decoded upload) count once towards the total. Sessions that
+    have ended are dropped by prune.
+    """
+
+    def __init__(self, max_bytes=SESSION_STORE_BYTES, storage=SESSION_STORAGE, spill=SESSION_SPILL):
+        if storage not in ("float32", "int16"):
+            raise ValueError(f"Unknown session storage: {storage}")
+        self.max_bytes = max_bytes
+        self.storage = storage
+        self.spill = spill
+        self._entries = {}
+        self._buffers = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._spill_dir = None
+        self.last_prune = time.monotonic()
+        self.evictions = 0
+
+    def _encode(self, array):
+        """
+        Returns (data, scale) in the store's storage format, reusing float32
+        input as is. Memory-mapped audio is kept as the mapping, which is
+        file-backed and counts no resident bytes.
+        """
+        if isinstance(array, MappedAudio):
+            return array, None
+        array = np.asarray(array)
+        if self.storage == "int16":
+            peak = float(np.max(np.abs(array))) if array.size else 0.0
+            scale = peak / 32767 if peak > 0 else 1.0
+            return np.round(array / scale).astype(np.int16), scale
+        return array.astype(np.float32, copy=False), None
+
+    def _track(self, data, sign):
+        """Adds or removes an in-memory array from the resident total. Call with _lock held."""
+        buffer = _buffer_id(data)
+        count = self._buffers.get(buffer, 0) + sign
+        if count == 0:
+            del self._buffers[buffer]
+            self._bytes -= data.nbytes
+        else:
+            self._buffers[buffer] = count
+            if sign > 0 and count == 1:
+                self._bytes += data.nbytes
+
+    def _release(self, entry):
+        """Frees an entry's memory or spill file. Call with _lock held."""
+        if entry.path is not None:
+            entry.data = None
+            os.remove(entry.path)
+        elif not entry.spilling:
+            # An entry being spilled is already out of the total; _spill cleans up after it
+            self._track(entry.data, -1)
+
+    def _evict(self):
+        """
+        Picks least recently used arrays until the total fits, taking them
+        out of the total and dropping them, or, when spilling, marking them
+        for _spill. Call with _lock held.
+
+        Returns the (key, entry) pairs to spill.
+        """
+        resident = sorted((entry.last_used, key) for key, entry in self._entries.items()
+                          if entry.path is None and not entry.spilling)
+        victims = []
+        for _, key in resident:
+            if self._bytes <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if not entry.owned or self._buffers[_buffer_id(entry.data)] > 1:
+                # Something else still holds this buffer, so evicting it frees nothing
+                continue
+            self._track(entry.data, -1)
+            self.evictions += 1
+            if self.spill:
+                entry.spilling = True
+                victims.append((key, entry))
+            else:
+                del self._entries[key]
+        if victims and self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="lab-session-")
+            atexit.register(shutil.rmtree, self._spill_dir, True)
+        return victims
+
+    def _spill(self, victims):
+        """
+        Writes the entries _evict picked to .npy files without holding the
+        lock, then swaps in memory maps of them. Call without _lock held.
+        """
+        for key, entry in victims:
+            path = os.path.join(self._spill_dir, f"{uuid.uuid4().hex}.npy")
+            np.save(path, entry.data)
+            with self._lock:
+                current = self._entries.get(key) is entry
+                if current:
+                    entry.path = path
+                    entry.data = np.load(path, mmap_mode='r')
+                    entry.spilling = False
+            if not current:
+                # Replaced or dropped while it was written
+                os.remove(path)
+
+    def put(self, session_id, name, array):
+        """Stores an array for a session under a name, replacing any previous one; None removes it."""
+        with self._lock:
+            previous = self._entries.pop((session_id, name), None)
+            if previous is not None:
+                self._release(previous)
+            if array is None:
+                return
+            entry = _Entry(*self._encode(array))
+            self._entries[(session_id, name)] = entry
+            self._track(entry.data, +1)
+            victims = self._evict()
+        self._spill(victims)
+
+    def get(self, session_id, name):
+        """Returns a session's float32 array by name, or None if it was never stored or was dropped."""
+        with self._lock:
+            entry = self._entries.get((session_id, name))
+            if entry is None:
+                return None
+            entry.last_used = time.monotonic()
+            data, scale = entry.data, entry.scale
+        if scale is None:
+            return data
+        return data.astype(np.float32) * np.float32(scale)
+
+    def drop_session(self, session_id):
+        """Removes every array a session stored."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == session_id]:
+                self._release(self._entries.pop(key))
+
+    def prune(self, is_active=lambda session_id: True, ttl=SESSION_TTL, grace=SESSION_GRACE):
+        """
+        Drops the arrays of sessions that have ended: those idle for grace
+        seconds that is_active(session_id) reports inactive, and those idle
+        for ttl seconds regardless. Returns the dropped session ids.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.last_prune = now
+            last_used = {}
+            for (session_id, _), entry in self._entries.items():
+                last_used[session_id] = max(last_used.get(session_id, 0.0), entry.last_used)
+        ended = [session_id for session_id, used in last_used.items()
+                 if now - used > ttl or (now - used > grace and not is_active(session_id))]
+        for session_id in ended:
+            self.drop_session(session_id)
+        return ended
+
+    def stats(self):
+        """Returns resident, per-session and spilled byte counts."""
+        with self._lock:
+            per_session = {}
+            spilled = 0
+            for (session_id, _), entry in self._entries.items():
+                per_session[session_id] = per_session.get(session_id, 0) + entry.nbytes
+                if entry.path is not None:
+                    spilled += entry.nbytes
+            return {
+                "sessions": len(per_session),
+                "resident_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "spilled_bytes": spilled,
+                "evictions": self.evictions,
+                "per_session": per_session,
+            }
+
+
+# Shared by every session in the process
+session_store = SessionStore()
+
+
+def _session_id():
+    """Returns the current Streamlit session's id."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "bare"
+
+
+def _is_active_session(session_id):
+    """Returns whether the Streamlit runtime still has a session connected, True without a runtime."""
+    if not runtime.exists():
+        return True
+    return runtime.get_instance().is_active_session(session_id)
+
+
+def prune_sessions(store=session_store):
+    """Drops the arrays of ended sessions, at most once every PRUNE_INTERVAL seconds, see SessionStore.prune."""
+    if time.monotonic() - store.last_prune >= PRUNE_INTERVAL:
+        store.prune(_is_active_session)
+
+
+def store_array(name, array, store=session_store):
+    """Stores an array for the current session, see SessionStore.put."""
+    store.put(_session_id(), name, array)
+    prune_sessions(store)
+
+
+def load_array(name, store=session_store):
+    """Returns the current session's array by name, or None, see SessionStore.get."""
+    return store.get(_session_id(), name)
+
+
+def show_store_usage(store=session_store):
+    """Shows the current session's and the whole process's session array memory."""
+    prune_sessions(store)
+    stats = store.stats()
+    mine = stats["per_session"].get(_session_id(), 0)
+    st.caption(
+        f"Session audio memory: {mine / 2**20:.1f} MB for this session | "
+        f"{stats['resident_bytes'] / 2**20:.1f} of {stats['max_bytes'] / 2**20:.0f} MB in use across "
+        f"{stats['sessions']} sessions | {stats['spilled_bytes'] / 2**20:.1f} MB spilled to disk"
+    )
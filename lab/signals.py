@@ -0,0 +1,120 @@
+import numpy as np
+from scipy.fft import next_fast_len
+
+# Waveform types understood by the synthesis functions
+WAVEFORMS = ("Sin", "Cos", "Square")
+
+# Operations that combine component signals into a result signal
+OPERATIONS = ("Addition", "Subtraction", "Multiplication")
+
+# Highest harmonic of a square wave that the sample grid has to resolve
+SQUARE_HARMONIC = 9
+
+# Samples per period of the highest frequency, enough for smooth time plots
+SAMPLES_PER_PERIOD = 10
+
+# Bounds on the number of samples in a planned grid
+MIN_SAMPLES = 256
+MAX_SAMPLES = 2 ** 22
+
+# Bound on samples across every signal generated on a planned grid (32 MB of float64)
+MAX_GRID_VALUES = 2 ** 22
+
+
+def generate_signals(t, amplitudes, frequencies, phases, func_types):
+    """
+    Generates several waveforms on a shared time axis in one vectorized pass.
+
+    amplitudes, frequencies, phases and func_types are equal-length sequences,
+    one entry per signal. Unknown waveform types give an all-zero row.
+
+    Returns an (n_signals, n_samples) array.
+    """
+    t = np.asarray(t, dtype=float)
+    amplitudes = np.asarray(amplitudes, dtype=float)
+    frequencies = np.asarray(frequencies, dtype=float)
+    phases = np.asarray(phases, dtype=float)
+    func_types = np.asarray(func_types)
+
+    is_cos = func_types == "Cos"
+    is_square = func_types == "Square"
+    is_known = np.isin(func_types, WAVEFORMS)
+
+    # cos(x) = sin(x + pi/2), so every waveform needs only one sine evaluation
+    phase_offsets = phases + np.where(is_cos, np.pi / 2, 0.0)
+    signals = np.sin(2 * np.pi * frequencies[:, None] * t[None, :] + phase_offsets[:, None])
+    signals[is_square] = np.sign(signals[is_square])
+    signals *= np.where(is_known, amplitudes, 0.0)[:, None]
+    return signals
+
+
+def generate_signal(t, amplitude, frequency, func_type, phase_shift):
+    """Generates a single waveform, see generate_signals."""
+    return generate_signals(t, [amplitude], [frequency], [phase_shift], [func_type])[0]
+
+
+def combine_signals(signals, operation):
+    """
+    Combines the rows of an (n_signals, n_samples) array into one signal.
+
+    Addition sums every row, Subtraction subtracts the remaining rows from the
+    first one and Multiplication takes the product of all rows.
+    """
+    signals = np.asarray(signals)
+    if operation == "Addition":
+        return signals.sum(axis=0)
+    elif operation == "Subtraction":
+        return signals[0] - signals[1:].sum(axis=0)
+    elif operation == "Multiplication":
+        return signals.prod(axis=0)
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def signal_bandwidth(frequencies, func_types, operation="Addition"):
+    """
+    Returns the highest frequency (Hz) present after combining the signals.
+
+    Square waves count up to their SQUARE_HARMONIC-th harmonic. Multiplying
+    signals produces sum frequencies, so the bandwidths add up; addition and
+    subtraction keep the largest one.
+    """
+    frequencies = np.abs(np.asarray(frequencies, dtype=float))
+    harmonics = np.where(np.asarray(func_types) == "Square", SQUARE_HARMONIC, 1)
+    bandwidths = frequencies * harmonics
+    if len(bandwidths) == 0:
+        return 0.0
+    if operation == "Multiplication":
+        return float(bandwidths.sum())
+    return float(bandwidths.max())
+
+
+def plan_sample_count(duration, bandwidth, samples_per_period=SAMPLES_PER_PERIOD, num_signals=1):
+    """
+    Returns (num_samples, clipped) for a time grid that resolves a signal of
+    the given bandwidth.
+
+    The sample count is the smallest one giving samples_per_period samples per
+    period of the bandwidth (at least Nyquist), clipped to MIN_SAMPLES below
+    and, above, to MAX_SAMPLES and to MAX_GRID_VALUES shared by num_signals
+    signals, then rounded to a fast FFT length. clipped tells whether the
+    upper bound lowered the count.
+    """
+    samples_per_period = max(samples_per_period, 2)
+    wanted = int(np.ceil(duration * bandwidth * samples_per_period))
+    limit = max(min(MAX_SAMPLES, MAX_GRID_VALUES // max(num_signals, 1)), MIN_SAMPLES)
+    num_samples = next_fast_len(min(max(wanted, MIN_SAMPLES), limit), real=True)
+    return num_samples, wanted > limit
+
+
+def plan_sample_grid(duration, bandwidth, samples_per_period=SAMPLES_PER_PERIOD, num_signals=1):
+    """
+    Chooses a time grid that resolves a signal of the given bandwidth, see
+    plan_sample_count. The grid excludes the end point so the spacing is
+    exactly duration / num_samples.
+
+    Returns (t, sample_rate).
+    """
+    num_samples, _ = plan_sample_count(duration, bandwidth, samples_per_period, num_signals)
+    sample_rate = num_samples / duration
+    t = np.arange(num_samples) / sample_rate
+    return t, sample_rate
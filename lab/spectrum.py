@@ -0,0 +1,186 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import signal
+from scipy.fft import next_fast_len, rfft, rfftfreq
+
+from lab.audio_io import MappedAudio
+
+# Inputs longer than this are averaged with Welch's method
+WELCH_MIN_SAMPLES = 2 ** 20
+
+# Segment length for Welch averaging
+WELCH_SEGMENT = 2 ** 16
+
+# Ratio of the decimated Nyquist frequency to the top of a band_spectrum
+# view, keeping the view inside the decimation filter's flat passband
+BAND_MARGIN = 1.25
+
+# Bands narrower than this fraction of the decimated rate use the chirp-Z
+# transform; wider ones are cheaper to cut from a real FFT
+ZOOM_MAX_FRACTION = 0.25
+
+# Most frequencies returned by band_spectrum at its default resolution
+BAND_MAX_POINTS = 2 ** 16
+
+
+@lru_cache(maxsize=32)
+def get_window(name, n):
+    """Returns a cached, read-only window of the given scipy name and length."""
+    window = signal.get_window(name, n)
+    window.setflags(write=False)
+    return window
+
+
+def fast_length(n):
+    """Returns the smallest length >= n that real FFTs handle quickly."""
+    return next_fast_len(int(n), real=True)
+
+
+def rfft_spectrum(x, sample_rate, n_fft=None, window=None, axis=-1):
+    """
+    Computes the one-sided complex spectrum of a real signal.
+
+    n_fft defaults to the next fast length at or above the signal length
+    (zero-padding); window is an optional scipy window name applied first.
+
+    Returns (freqs, spectrum).
+    """
+    x = np.asarray(x)
+    n = x.shape[axis]
+    if window is not None:
+        shape = [1] * x.ndim
+        shape[axis] = n
+        x = x * get_window(window, n).reshape(shape)
+    if n_fft is None:
+        n_fft = fast_length(n)
+    return rfftfreq(n_fft, 1 / sample_rate), rfft(x, n_fft, axis=axis, workers=-1)
+
+
+def magnitude_spectrum(x, sample_rate, n_fft=None, window=None, axis=-1):
+    """Returns (freqs, |X|) of the one-sided spectrum."""
+    freqs, spectrum = rfft_spectrum(x, sample_rate, n_fft=n_fft, window=window, axis=axis)
+    return freqs, np.abs(spectrum)
+
+
+def amplitude_spectrum(x, sample_rate, axis=-1):
+    """
+    Returns (freqs, 2/N |X|) below the Nyquist bin, so a sinusoid's peak
+    reads as its amplitude.
+    """
+    n = np.shape(x)[axis]
+    freqs, magnitude = magnitude_spectrum(x, sample_rate, n_fft=n, axis=axis)
+    keep = n // 2
+    return freqs[:keep], 2.0 / n * np.take(magnitude, np.arange(keep), axis=axis)
+
+
+def energy_spectrum(x, sample_rate, axis=-1):
+    """Returns (freqs, |X|^2 / N) below the Nyquist bin."""
+    n = np.shape(x)[axis]
+    freqs, spectrum = rfft_spectrum(x, sample_rate, n_fft=n, axis=axis)
+    keep = n // 2
+    spectrum = np.take(spectrum, np.arange(keep), axis=axis)
+    return freqs[:keep], (spectrum.real ** 2 + spectrum.imag ** 2) / n
+
+
+def band_spectrum(x, sample_rate, f_min, f_max, resolution=None, window="hann", axis=-1):
+    """
+    Computes |X| on f_min..f_max only, for views of a band of a long signal.
+
+    The signal is first decimated with a polyphase filter to about
+    2 * BAND_MARGIN * f_max, so the work follows the band rather than the
+    full rate. At the native resolution (sample_rate / N) the band is cut
+    from one real FFT of the decimated signal. A coarser resolution, in
+    Hz, is evaluated on half-overlapping windowed segments whose power is
+    averaged; narrow bands use the chirp-Z (zoom) FFT, which computes only
+    the band's frequencies. resolution defaults to the native one,
+    coarsened so the band holds at most BAND_MAX_POINTS frequencies.
+
+    Magnitudes are scaled so a sinusoid's peak matches magnitude_spectrum
+    of the original signal. MappedAudio is read along its frame axis, one
+    block at a time, whatever axis says.
+
+    Returns (freqs, magnitude).
+    """
+    if not 0 <= f_min < f_max <= sample_rate / 2:
+        raise ValueError("The band must satisfy 0 <= f_min < f_max <= sample_rate / 2")
+    factor = max(int(sample_rate // (2 * BAND_MARGIN * f_max)), 1)
+    if isinstance(x, MappedAudio):
+        # Decimated block by block along the frame axis, so only the decimated signal is held
+        full_length = len(x)
+        x = np.moveaxis(x.decimate(factor) if factor > 1 else np.asarray(x), 0, -1)
+        axis = 0
+    else:
+        x = np.moveaxis(np.asarray(x), axis, -1)
+        full_length = x.shape[-1]
+        if factor > 1:
+            x = signal.resample_poly(x, 1, factor, axis=-1)
+    rate = sample_rate / factor
+    n = x.shape[-1]
+    if resolution is None:
+        resolution = max(rate / n, (f_max - f_min) / (BAND_MAX_POINTS - 1))
+
+    if resolution * n <= rate:
+        # Native resolution: one transform of the whole decimated signal
+        n_fft = fast_length(n)
+        freqs = rfftfreq(n_fft, 1 / rate)
+        keep = (freqs >= f_min) & (freqs <= f_max)
+        magnitude = factor * np.abs(rfft(x, n_fft, axis=-1, workers=-1)[..., keep])
+        return freqs[keep], np.moveaxis(magnitude, -1, axis)
+
+    segment = min(fast_length(rate / resolution), n)
+    if f_max - f_min < ZOOM_MAX_FRACTION * rate:
+        # Narrow band: the chirp-Z transform evaluates only the band
+        num_points = int((f_max - f_min) / resolution) + 1
+        freqs = np.linspace(f_min, f_max, num_points)
+        transform = signal.ZoomFFT(segment, [f_min, f_max], m=num_points, fs=rate, endpoint=True)
+    else:
+        # Wide band: a real FFT of the segment is cheaper than the chirp-Z
+        freqs = rfftfreq(segment, 1 / rate)
+        keep = (freqs >= f_min) & (freqs <= f_max)
+        freqs = freqs[keep]
+
+        def transform(block):
+            return rfft(block, axis=-1, workers=-1)[..., keep]
+    taper = get_window(window, segment)
+    power = np.zeros(x.shape[:-1] + (len(freqs),))
+    starts = range(0, n - segment + 1, segment // 2)
+    for start in starts:
+        power += np.abs(transform(x[..., start:start + segment] * taper)) ** 2
+    magnitude = np.sqrt(power / len(starts)) * (full_length / taper.sum())
+    return freqs, np.moveaxis(magnitude, -1, axis)
+
+
+def power_spectrum(x, sample_rate, window="hann", segment=WELCH_SEGMENT, axis=-1):
+    """
+    Estimates the power spectral density of a signal.
+
+    Short inputs use a single windowed periodogram; inputs longer than
+    WELCH_MIN_SAMPLES are averaged over half-overlapping segments with
+    Welch's method, which bounds the transform size and smooths the estimate.
+
+    Returns (freqs, psd).
+    """
+    x = np.asarray(x)
+    n = x.shape[axis]
+    if n <= WELCH_MIN_SAMPLES:
+        return signal.periodogram(x, sample_rate, window=get_window(window, n),
+                                  nfft=fast_length(n), axis=axis)
+    segment = min(segment, n)
+    return signal.welch(x, sample_rate, window=get_window(window, segment),
+                        nperseg=segment, axis=axis)
+
+
+def peak_frequency(x, sample_rate):
+    """
+    Returns the frequency of the strongest spectral component, ignoring the
+    Nyquist bin. Long inputs use the Welch estimate.
+    """
+    x = np.asarray(x)
+    if len(x) > WELCH_MIN_SAMPLES:
+        freqs, magnitude = power_spectrum(x, sample_rate)
+        keep = len(freqs) - 1
+    else:
+        freqs, magnitude = magnitude_spectrum(x, sample_rate, n_fft=len(x))
+        keep = len(x) // 2
+    return freqs[np.argmax(magnitude[:keep])]
@@ -0,0 +1,78 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.fft import rfft, rfftfreq
+
+from lab.resampling import sample_and_reconstruct
+
+# Longest excerpt, in samples, evaluated by a sweep
+SWEEP_MAX_SAMPLES = 2 ** 15
+
+# Frequency bins kept per rate for the spectrum heatmap
+SWEEP_SPECTRUM_BINS = 256
+
+# Upper bound on sweep worker threads
+SWEEP_MAX_WORKERS = 8
+
+
+def aliased_frequency(frequency, sample_rate):
+    """Returns the apparent frequency of a tone after sampling, for arrays of either."""
+    frequency = np.asarray(frequency, dtype=float)
+    sample_rate = np.asarray(sample_rate, dtype=float)
+    return np.abs(frequency - sample_rate * np.round(frequency / sample_rate))
+
+
+def _bin_spectrum(magnitude, bins):
+    """Reduces a magnitude spectrum to a fixed number of bins, keeping each bin's peak."""
+    usable = len(magnitude) // bins * bins
+    if usable == 0:
+        return np.pad(magnitude, (0, bins - len(magnitude)))
+    return magnitude[:usable].reshape(bins, -1).max(axis=1)
+
+
+def sweep_sampling_rates(x, source_rate, rates, kernel="linear", anti_alias=False,
+                         spectrum_bins=SWEEP_SPECTRUM_BINS, max_workers=None):
+    """
+    Samples and reconstructs a signal at every rate in a grid.
+
+    Only the first SWEEP_MAX_SAMPLES samples are used. Rates are evaluated
+    in parallel on a thread pool; the FFT and interpolation routines release
+    the GIL.
+
+    Returns a dict with the rates, the reconstruction SNR (dB), the relative
+    spectral error, the strongest reconstructed frequency, and a
+    (n_rates, spectrum_bins) magnitude heatmap with its bin frequencies.
+    """
+    x = np.asarray(x, dtype=float)[:SWEEP_MAX_SAMPLES]
+    rates = np.asarray(rates, dtype=float)
+    freqs = rfftfreq(len(x), 1 / source_rate)
+    reference = np.abs(rfft(x))
+    signal_energy = np.dot(x, x)
+    reference_norm = np.linalg.norm(reference)
+
+    def evaluate(rate):
+        reconstructed = sample_and_reconstruct(x, source_rate, rate, anti_alias=anti_alias, kernel=kernel)
+        error = x - reconstructed
+        error_energy = np.dot(error, error)
+        snr = 10 * np.log10(signal_energy / error_energy) if error_energy > 0 else np.inf
+        magnitude = np.abs(rfft(reconstructed))
+        spectral_error = np.linalg.norm(magnitude - reference) / reference_norm if reference_norm > 0 else 0.0
+        peak = freqs[np.argmax(magnitude[:-1])] if len(magnitude) > 1 else 0.0
+        return snr, spectral_error, peak, _bin_spectrum(magnitude, spectrum_bins)
+
+    if max_workers is None:
+        max_workers = min(SWEEP_MAX_WORKERS, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(evaluate, rates))
+
+    snr_db, spectral_error, peaks, heatmap = zip(*results) if results else ((), (), (), ())
+    bin_width = max(len(freqs) // spectrum_bins, 1)
+    return {
+        "rates": rates,
+        "snr_db": np.array(snr_db),
+        "spectral_error": np.array(spectral_error),
+        "peak_frequency": np.array(peaks),
+        "heatmap": np.array(heatmap).reshape(len(rates), spectrum_bins),
+        "heatmap_freqs": freqs[::bin_width][:spectrum_bins],
+    }
@@ -1,8 +1,15 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.fft import fft, fftfreq
-import base64
+import soundfile as sf
+from lab.audio_io import AudioTooLargeError, read_audio, read_audio_with_progress
+from lab.chrome import render_chrome
+from lab.figures import new_figure, show_figure
+from lab.plotting import plot_decimated
+from lab.figure_cache import make_key, show_cached_figure
+from lab.signals import (OPERATIONS, WAVEFORMS, combine_signals, generate_signals, plan_sample_count, plan_sample_grid,
+                         signal_bandwidth)
+from lab.spectrum import amplitude_spectrum, energy_spectrum
+from lab.correlation import autocorrelation, cross_correlation, estimate_delay
 
 # Set Streamlit page configuration
 st.set_page_config(
@@ -11,168 +18,8 @@ st.set_page_config(
     page_icon=" "  # Placeholder for page icon
 )
 
-# Inject custom CSS for scrollbar styling
-st.markdown("""
-    <style>
-    /* Scrollbar track */
-    ::-webkit-scrollbar {
-        width: 16px;  
-        height: 16px; 
-    }
-
-    /* Scrollbar thumb (the draggable part) */
-    ::-webkit-scrollbar-thumb {
-        background-color: #888;
-        border-radius: 8px;
-        border: 3px solid transparent;
-        background-clip: content-box;
-    }
-
-    /* Scrollbar thumb on hover */
-    ::-webkit-scrollbar-thumb:hover {
-        background-color: #555;
-    }
-
-    /* Scrollbar track */
-    ::-webkit-scrollbar-track {
-        background: #f1f1f1;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Function to encode an image as a Base64 string
-def get_base64_image(image_path):
-    """Encodes an image file to Base64 format."""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception as e:
-        st.error(f"Error encoding image: {e}")
-        return None
-
-# Paths to logo and banner images
-logo_path = "static/fcritlogo.png"  # Ensure this path is correct
-banner_path = "Media/Website_Banner.jpeg"  # Ensure this path is correct
-
-# Encode images in Base64
-logo_base64 = get_base64_image(logo_path)
-banner_base64 = get_base64_image(banner_path)
-
-# Inject custom CSS for header styling
-st.markdown(
-    f"""
-    <style>
-    .header {{
-        position: fixed;
-        left: 0;
-        top: 0;
-        width: 100%;
-        height: 148px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 90px 10px;
-        z-index: 1000;
-        overflow: hidden;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-    }}
-    
-
-    .header p {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 15px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header p1 {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 30px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-        padding-top: 50px; /* Adjust this value to move text down */
-    }}
-
-    .logo-container {{
-        padding-right: 20px;
-        padding-top: 60px;
-    }}
-
-    .logo-container img {{
-        width: 100px;
-        height: auto;
-    }}
-    .stApp {{
-        margin-top: 180px; /* Push content below the fixed header */
-        padding-bottom: 80px; /* Avoid footer overlap */
-    }}
-
-    .footer {{
-        position: fixed;
-        left: 0;
-        bottom: 0;
-        width: 100%;
-        height: 42px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 10px;
-        font-size: 14px;
-        z-index: 1000;
-    }}
-    </style>
-
-    <!-- Header section with logo on the top-right corner -->
-    <div class="header">
-        <div class="header-content">
-            <p><b>AGNEL CHARITIES</b></p>
-            <p1><b>FR. C. RODRIGUES INSTITUTE OF TECHNOLOGY</b></p1>
-            <p>Agnel Technical Education Complex Sector 9-A, Vashi, Navi Mumbai, Maharashtra, India PIN - 400703</p>
-            <p>(An Autonomous Institute & Permanently Affiliated To University Of Mumbai)</p>
-        </div>
-        <div class="logo-container">
-            <img src="data:image/png;base64,{logo_base64}" alt="Institute Logo">
-        </div>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-
-# Inject custom CSS for footer
-st.markdown(
-    """
-    <div class="footer">
-        <p>© Fr. Conceicao Rodrigues Institute of Technology. All rights reserved.</p>
-    </div>
-    """, 
-    unsafe_allow_html=True
-)
-
-# Hide Streamlit default menu
-hide_menu = """
-<style>
-#MainMenu {
-visibility:hidden;
-}
-</style>
-"""
-
-# Remove unnecessary UI elements
-st.markdown("""<style>[data-testid="stDecoration"] { display: none; }</style>""", unsafe_allow_html=True)
-st.markdown(hide_menu, unsafe_allow_html=True)  # Apply hidden menu style
-st.markdown(hide_menu, unsafe_allow_html=True)
+# Render the shared header, footer and page styling
+render_chrome()
 
 st.header("Operations on Signal", divider=True)
 
@@ -192,7 +39,7 @@ st.markdown("""
 st.subheader("- Mathematical Signal Operations")
 st.markdown("""
 - **Addition**: Combine multiple signals to generate complex waveforms.  
-- **Subtraction**: Analyze the difference between two signals.  
+- **Subtraction**: Analyze the difference between the first signal and the rest.  
 - **Multiplication**: Perform amplitude modulation and other signal processing tasks.  
 """)
 
@@ -218,16 +65,10 @@ option = st.selectbox(
 
 if option=="Operation on Signal":
     st.header("Parameters of Signal", divider="blue")
-    def generate_signal(t, amplitude, frequency, func_type, phase_shift):
-         # Function to generate the signals based on the selected function
-         if func_type == "Sin":
-             return amplitude * np.sin(2 * np.pi * frequency * t + phase_shift)
-         elif func_type == "Cos":
-             return amplitude * np.cos(2 * np.pi * frequency * t + phase_shift)
-         elif func_type == "Square":
-             return amplitude * np.sign(np.sin(2 * np.pi * frequency * t + phase_shift))
-         else:
-             return np.zeros_like(t)
+
+    # Component signals are shown one per row up to this count, then overlaid
+    MAX_COMPONENT_ROWS = 4
+    COMPONENT_COLORS = ['darkblue', 'orangered', 'purple', 'teal']
 
     def handle_selection():
         # Options for dropdown menus
@@ -235,73 +76,74 @@ if option=="Operation on Signal":
         Freq_option = [30.0, 40.0, 50.0, 60.0]
         Phase_option = [0.0, 1.0, 2.0, 3.0, 4.0]
         Time_option = [1.0, 2.0, 3.0, 4.0, 5.0]
-        num_points = 1000
-
-        # Creating GUI
-        col1, col2 = st.columns(2)
-        with col1:
-            Amp_selection_1 = st.number_input("Amplitude 1:", value=Amp_option[0], step=5.0, format="%.1f")
-            Freq_selection_1 = st.number_input("Frequency 1 (Hz):", value=Freq_option[0], step=5.0, format="%.1f")
-            Phase_selection_1 = st.number_input("Phase Shift 1 (Rad/sec):", value=Phase_option[0], step=1.0, format="%.1f")
-            Function_selection_1 = st.selectbox("Function 1:", ("Sin", "Cos", "Square"))
-        with col2:
-            Amp_selection_2 = st.number_input("Amplitude 2:", value=Amp_option[0], step=5.0, format="%.1f")
-            Freq_selection_2 = st.number_input("Frequency 2 (Hz):", value=Freq_option[0], step=5.0, format="%.1f")
-            Phase_selection_2 = st.number_input("Phase Shift 2 (Rad/sec):", value=Phase_option[0], step=1.0, format="%.1f")
-            Function_selection_2 = st.selectbox("Function 2:", ("Sin", "Cos", "Square"))
-
-        Time_Duration = st.number_input("Time Duration (Sec.):", value=Time_option[0], step=1.0, format="%.1f")
-        Operation_selection = st.selectbox("Operation:", ("Addition", "Subtraction", "Multiplication"))
-
-        # Time array for the signals
-        t = np.linspace(0, Time_Duration, num_points)
-    
-        # Create the signals based on the selected parameters
-        signal_1 = generate_signal(t, Amp_selection_1, Freq_selection_1, Function_selection_1, Phase_selection_1)
-        signal_2 = generate_signal(t, Amp_selection_2, Freq_selection_2, Function_selection_2, Phase_selection_2)
-
-        # Perform the selected operation
-        if Operation_selection == "Addition":
-            result_signal = signal_1 + signal_2
-        elif Operation_selection == "Subtraction":
-            result_signal = signal_1 - signal_2
-        elif Operation_selection == "Multiplication":
-            result_signal = signal_1 * signal_2
-
-        return t, signal_1, signal_2, result_signal
-
-    def plotting_signal(t, signal_1, signal_2, result_signal):
-            N = len(t)
-            T = t[1] - t[0]
-            xf = fftfreq(N, T)[:N//2]
-            yf_1 = fft(signal_1)
-            yf_2 = fft(signal_2)
-            yf_result = fft(result_signal)
-
-            fig, axes = plt.subplots(3, 2, figsize=(10, 8))
-            axes[0, 0].plot(t, signal_1, color='darkblue')
-            axes[0, 0].set_title("Signal 1")
-            axes[0, 1].plot(xf, 2.0/N * np.abs(yf_1[:N//2]), color='darkblue')
-            axes[0, 1].set_title("Frequency Spectrum of Signal 1")
-
-            axes[1, 0].plot(t, signal_2, color='orangered')
-            axes[1, 0].set_title("Signal 2")
-            axes[1, 1].plot(xf, 2.0/N * np.abs(yf_2[:N//2]), color='orangered')
-            axes[1, 1].set_title("Frequency Spectrum of Signal 2")
-    
-            axes[2, 0].plot(t, result_signal, color='green')
-            axes[2, 0].set_title("Result Signal")
-            axes[2, 1].plot(xf, 2.0/N * np.abs(yf_result[:N//2]), color='green')
-            axes[2, 1].set_title("Frequency Spectrum of Result Signal")
-    
-            plt.tight_layout()
-            st.pyplot(fig)
-    
-    t, signal_1, signal_2, result_signal = handle_selection()
 
+        num_signals = st.number_input("Number of Signals:", min_value=1, max_value=50, value=2, step=1)
+
+        # Creating GUI, alternating the component signals between two columns
+        amplitudes, frequencies, phases, functions = [], [], [], []
+        columns = st.columns(2)
+        for i in range(1, num_signals + 1):
+            with columns[(i - 1) % 2]:
+                amplitudes.append(st.number_input(f"Amplitude {i}:", value=Amp_option[0], step=5.0, format="%.1f"))
+                frequencies.append(st.number_input(f"Frequency {i} (Hz):", value=Freq_option[0], step=5.0, format="%.1f"))
+                phases.append(st.number_input(f"Phase Shift {i} (Rad/sec):", value=Phase_option[0], step=1.0, format="%.1f"))
+                functions.append(st.selectbox(f"Function {i}:", WAVEFORMS))
+
+        Time_Duration = st.number_input("Time Duration (Sec.):", min_value=0.1, value=Time_option[0], step=1.0, format="%.1f")
+        Operation_selection = st.selectbox("Operation:", OPERATIONS)
+
+        # Sample count for the signals, fast enough for the combined bandwidth within the memory bound
+        bandwidth = signal_bandwidth(frequencies, functions, Operation_selection)
+        num_samples, clipped = plan_sample_count(Time_Duration, bandwidth, num_signals=num_signals)
+        st.caption(f"Sampling Rate: {num_samples / Time_Duration:.1f} Hz ({num_samples} samples)")
+        if clipped:
+            st.warning("The sample grid was limited to keep memory use bounded, so high frequencies "
+                       "may be under-resolved. Use fewer signals, lower frequencies or a shorter duration.")
+
+        return (amplitudes, frequencies, phases, functions, Time_Duration, Operation_selection, bandwidth, num_signals)
+
+    def synthesize(amplitudes, frequencies, phases, functions, duration, operation, bandwidth, num_signals):
+        # Create all component signals in one pass and perform the selected operation
+        t, _ = plan_sample_grid(duration, bandwidth, num_signals=num_signals)
+        signals = generate_signals(t, amplitudes, frequencies, phases, functions)
+        return t, signals, combine_signals(signals, operation)
+
+    def plotting_signal(t, signals, result_signal):
+            sample_rate = 1 / (t[1] - t[0])
+            xf, yf_signals = amplitude_spectrum(signals, sample_rate)
+            _, yf_result = amplitude_spectrum(result_signal, sample_rate)
+
+            # One row per component (or a single overlaid row), plus the result
+            num_signals = len(signals)
+            overlay = num_signals > MAX_COMPONENT_ROWS
+            component_rows = 1 if overlay else num_signals
+            fig, axes = new_figure(component_rows + 1, 2, figsize=(10, 8 * (component_rows + 1) / 3), squeeze=False)
+            for i in range(num_signals):
+                row = 0 if overlay else i
+                color = COMPONENT_COLORS[i % len(COMPONENT_COLORS)]
+                plot_decimated(axes[row, 0], t, signals[i], color=color)
+                axes[row, 0].set_title(f"Signal {i + 1}")
+                plot_decimated(axes[row, 1], xf, yf_signals[i], color=color)
+                axes[row, 1].set_title(f"Frequency Spectrum of Signal {i + 1}")
+            if overlay:
+                axes[0, 0].set_title(f"Signals 1-{num_signals}")
+                axes[0, 1].set_title(f"Frequency Spectra of Signals 1-{num_signals}")
+
+            plot_decimated(axes[-1, 0], t, result_signal, color='green')
+            axes[-1, 0].set_title("Result Signal")
+            plot_decimated(axes[-1, 1], xf, yf_result, color='green')
+            axes[-1, 1].set_title("Frequency Spectrum of Result Signal")
+
+            fig.tight_layout()
+            return fig
+
+    settings = handle_selection()
+
+    # Signals are generated only when a figure has to be drawn, keyed by their settings
     if st.button("Plot"):
-        plotting_signal(t, signal_1, signal_2, result_signal)
-        
+        figure_key = make_key("operation_on_signal", settings)
+        show_cached_figure(figure_key, lambda: plotting_signal(*synthesize(*settings)))
+
 
 
 elif option=="Even & Odd Component":
@@ -372,25 +214,25 @@ elif option=="Even & Odd Component":
         else:
             return lambda t: np.zeros_like(t)
 
-    # Generate selected signal
-    signal = select_signal(signal_option)
-    x = signal(t)
+    # Function to build the figure of the selected signal and its components
+    def plotting_even_odd(signal_option):
+        # Generate selected signal
+        signal = select_signal(signal_option)
+        x = signal(t)
 
-    # Compute even and odd components
-    even_signal = 0.5 * (x + np.flip(x))
-    odd_signal = 0.5 * (x - np.flip(x))
-    
-    # Create a figure with 3 subplots
-    fig, axes = plt.subplots(3, 1, figsize=(12, 15))
-    ax1, ax2, ax3 = axes
+        # Compute even and odd components
+        even_signal = 0.5 * (x + np.flip(x))
+        odd_signal = 0.5 * (x - np.flip(x))
 
-    # Plot original signal
-    ax1.plot(t, x, label='Original Signal', color='blue')
-    ax2.plot(t, even_signal, label='Even Component', color='green')
-    ax3.plot(t, odd_signal, label='Odd Component', color='red')
+        # Create a figure with 3 subplots
+        fig, axes = new_figure(3, 1, figsize=(12, 15))
+        ax1, ax2, ax3 = axes
+
+        # Plot original signal
+        plot_decimated(ax1, t, x, label='Original Signal', color='blue')
+        plot_decimated(ax2, t, even_signal, label='Even Component', color='green')
+        plot_decimated(ax3, t, odd_signal, label='Odd Component', color='red')
 
-    # Display the plots on button click
-    if st.button("Plot"):
         for ax, title in zip([ax1, ax2, ax3], ['Original Signal', 'Even Component', 'Odd Component']):
             ax.set_xlim(-10, 10)
             ax.set_ylim(-1.5, 2.5)
@@ -399,8 +241,12 @@ elif option=="Even & Odd Component":
             ax.set_ylabel('Amplitude')
             ax.grid(True)
             ax.legend()
+        return fig
+
+    # Display the plots on button click
+    if st.button("Plot"):
         # Show the figure in Streamlit
-        st.pyplot(fig)
+        show_cached_figure(make_key("even_odd", signal_option), lambda: plotting_even_odd(signal_option))
 
 elif option=="Auto correlation":
     st.header("Autocorrelation & ESD", divider="blue")
@@ -454,60 +300,87 @@ elif option=="Auto correlation":
         else:
             return np.zeros_like(t)
 
-    # Function to compute autocorrelation
-    def autocorrelation(x):
-        n = len(x)
-        mean_x = np.mean(x)
-        x_centered = x - mean_x  # Normalize the signal
-        correlation = np.correlate(x_centered, x_centered, mode='full')
-        return correlation / (n * np.var(x))
-
     # Function to compute ESD
     def calculate_esd(signal, t):
-        fft_result = np.fft.fft(signal)
-        esd = (np.abs(fft_result) ** 2) / len(signal)
-        freqs = np.fft.fftfreq(len(signal), d=t[1] - t[0])
-        return freqs[:len(freqs) // 2], esd[:len(esd) // 2]
-        
-    signal_choice = st.selectbox("Function Type :", ["Sin", "Cos", "Square"])
-    
-    if st.button("Plot"):
-        t = np.linspace(0, 1, 1000)  # 1 second duration with 1000 samples
-        signal1 = generate_signal_2(signal_choice, t)
-        noise = np.random.normal(0, 0.5, signal1.shape)
-        signal2 = signal1 + noise
-
-        auto_corr_signal1 = autocorrelation(signal1)
-        auto_corr_signal2 = autocorrelation(signal2)
-        lags = np.arange(-len(signal1) + 1, len(signal1))
+        return energy_spectrum(signal, 1 / (t[1] - t[0]))
 
-        freqs, esd_noisy = calculate_esd(signal2, t)
+    source_choice = st.selectbox("Signal Source :", ["Generate Signal", "Upload Audio File (.wav)"])
 
-        fig, axs = plt.subplots(4, 1, figsize=(10, 20))
-        axs[0].plot(t, signal1, color='darkblue')
-        axs[0].set_title(f'Original Signal ({signal_choice.capitalize()} Waveform)')
-        axs[0].grid()
+    signal1 = None
+    if source_choice == "Generate Signal":
+        signal_choice = st.selectbox("Function Type :", ["Sin", "Cos", "Square"])
+        num_samples = st.number_input("Number of Samples :", min_value=100, max_value=1_000_000, value=1000, step=1000)
+        t = np.linspace(0, 1, int(num_samples))  # 1 second duration
+        signal1 = generate_signal_2(signal_choice, t)
+        signal_title = f'Original Signal ({signal_choice.capitalize()} Waveform)'
+        esd_max_freq = 3 * 5
+    else:
+        upload_file = st.file_uploader("Upload an audio file (WAV)", type=["wav"])
+        if upload_file:
+            try:
+                signal1, sample_rate = read_audio_with_progress(upload_file, mono=True, normalize=False)
+            except AudioTooLargeError as e:
+                st.error(str(e))
+                st.stop()
+            except sf.SoundFileError as e:
+                st.error(f"Could not read the audio file: {e}")
+                st.stop()
+            t = np.arange(len(signal1)) / sample_rate
+            signal_title = 'Original Signal (Uploaded Audio)'
+            esd_max_freq = sample_rate / 2
+
+    # Restricting the lag window keeps long signals fast to correlate
+    max_lag = st.number_input("Maximum Lag (samples, 0 = all) :", min_value=0, value=0, step=100)
+
+    # The noise comes from a per-session seed that is part of the figure key; New Noise draws another realization
+    plot_clicked = st.button("Plot")
+    new_noise = st.button("New Noise")
+    if new_noise or "autocorrelation_noise_seed" not in st.session_state:
+        st.session_state.autocorrelation_noise_seed = int(np.random.randint(2 ** 31))
+    noise_seed = st.session_state.autocorrelation_noise_seed
+
+    if plot_clicked or new_noise:
+        if signal1 is None:
+            st.error("Upload an audio file first!")
+            st.stop()
+        # Function to build the autocorrelation and ESD figure
+        def plotting_autocorrelation():
+            noise = np.random.default_rng(noise_seed).normal(0, 0.5, signal1.shape)
+            signal2 = signal1 + noise
+
+            lags, auto_corr_signal1 = autocorrelation(signal1, max_lag=max_lag or None)
+            _, auto_corr_signal2 = autocorrelation(signal2, max_lag=max_lag or None)
+
+            freqs, esd_noisy = calculate_esd(signal2, t)
+
+            fig, axs = new_figure(4, 1, figsize=(10, 20))
+            plot_decimated(axs[0], t, signal1, color='darkblue')
+            axs[0].set_title(signal_title)
+            axs[0].grid()
     
-        axs[1].plot(t, signal2, color='red')
-        axs[1].set_title('Original Signal + Noise')
-        axs[1].grid()
+            plot_decimated(axs[1], t, signal2, color='red')
+            axs[1].set_title('Original Signal + Noise')
+            axs[1].grid()
     
-        axs[2].plot(lags, auto_corr_signal1, label='Clean Signal', color='darkblue')
-        axs[2].plot(lags, auto_corr_signal2, label='Noisy Signal', color='red')
-        axs[2].set_title('Autocorrelation Results of Original Signal and Original+Noise')
-        axs[2].set_xlabel('Lags')
-        axs[2].legend()
-        axs[2].grid()
+            plot_decimated(axs[2], lags, auto_corr_signal1, label='Clean Signal', color='darkblue')
+            plot_decimated(axs[2], lags, auto_corr_signal2, label='Noisy Signal', color='red')
+            axs[2].set_title('Autocorrelation Results of Original Signal and Original+Noise')
+            axs[2].set_xlabel('Lags')
+            axs[2].legend()
+            axs[2].grid()
     
-        axs[3].plot(freqs, esd_noisy, color='magenta')
-        axs[3].set_xlim(0, 3 * 5)  # Limit frequency axis
-        axs[3].set_ylim(0, np.max(esd_noisy) * 1.1)
-        axs[3].set_title('Energy Spectral Density (ESD) of Noisy Signal')
-        axs[3].set_xlabel('Frequency (Hz)')
-        axs[3].set_ylabel('Energy Spectral Density')
-        axs[3].grid()
+            plot_decimated(axs[3], freqs, esd_noisy, color='magenta')
+            axs[3].set_xlim(0, esd_max_freq)  # Limit frequency axis
+            axs[3].set_ylim(0, np.max(esd_noisy) * 1.1)
+            axs[3].set_title('Energy Spectral Density (ESD) of Noisy Signal')
+            axs[3].set_xlabel('Frequency (Hz)')
+            axs[3].set_ylabel('Energy Spectral Density')
+            axs[3].grid()
     
-        st.pyplot(fig)
+            return fig
+
+        figure_key = make_key("autocorrelation", t, signal1, signal_title, esd_max_freq, max_lag, noise_seed)
+        show_cached_figure(figure_key, plotting_autocorrelation)
 
 
 elif option=="Cross correlation":
@@ -537,6 +410,7 @@ elif option=="Cross correlation":
     - Compute and visualize **cross-correlation** for **sinusoidal (sine, cosine) and square waveforms**.  
     - Analyze how signals correlate when mixed with **noisy versions** of themselves.  
     - Identify **signal patterns, delay estimation, and filtering performance**.  
+    - Upload **two recordings** and estimate their **time alignment** (standard or **GCC-PHAT** weighting).  
     """)
 
     # Applications
@@ -566,45 +440,108 @@ elif option=="Cross correlation":
         else:
             return np.zeros_like(t)
 
-    # Function to compute cross-correlation
-    def cross_correlation(x, y):
-        n = len(x)
-        mean_x = np.mean(x)
-        mean_y = np.mean(y)
-        x_centered = x - mean_x
-        y_centered = y - mean_y
-        correlation = np.correlate(x_centered, y_centered, mode='full')
-        return correlation / (n * np.std(x) * np.std(y))
+    # Function to read an uploaded WAV file as a mono float32 signal, stopping with an error if it cannot be read
+    def read_mono_wav(upload_file):
+        try:
+            return read_audio(upload_file, mono=True, normalize=False)
+        except AudioTooLargeError as e:
+            st.error(str(e))
+            st.stop()
+        except sf.SoundFileError as e:
+            st.error(f"Could not read {upload_file.name}: {e}")
+            st.stop()
 
     # Streamlit UI
 
-    signal_choice = st.selectbox("Function :", ["Sin", "Cos", "Square"])
+    source_choice = st.selectbox("Signal Source :", ["Generate Signal", "Upload Two Audio Files (.wav)"])
 
-    if st.button("Plot"):
-        t = np.linspace(0, 1, 1000)  # 1 second duration with 1000 samples
-        signal1 = generate_signal_3(signal_choice, t)
-        noise = np.random.normal(0, 0.5, signal1.shape)
-        signal2 = signal1 + noise
-        corr_result = cross_correlation(signal1, signal2)
-        lags = np.arange(-len(signal1) + 1, len(signal1))
-    
-        fig, axs = plt.subplots(3, 1, figsize=(13, 15))
-    
-        axs[0].plot(t, signal1, color='darkblue')
-        axs[0].set_title(f'Original Signal ({signal_choice.capitalize()} Waveform)')
-        axs[0].grid()
-    
-        axs[1].plot(t, signal2, color='red')
-        axs[1].set_title('Original Signal + Noise')
-        axs[1].grid()
-    
-        axs[2].plot(lags, corr_result, color='darkgreen')
-        axs[2].set_title('Cross-Correlation Result of Original Signal and Original Signal + Noise')
-        axs[2].set_xlabel('Lags')
-        axs[2].set_ylabel('Cross-Correlation')
-        axs[2].grid()
-    
-        st.pyplot(fig)
+    weighting_choice = st.selectbox("Correlation Weighting :", ["Standard", "GCC-PHAT"])
+    weighting = "phat" if weighting_choice == "GCC-PHAT" else None
 
-    
+    if source_choice == "Generate Signal":
+        signal_choice = st.selectbox("Function :", ["Sin", "Cos", "Square"])
+        max_lag = st.number_input("Maximum Lag (samples, 0 = all) :", min_value=0, value=0, step=100)
+
+        # The noise comes from a per-session seed that is part of the figure key; New Noise draws another realization
+        plot_clicked = st.button("Plot")
+        new_noise = st.button("New Noise")
+        if new_noise or "cross_correlation_noise_seed" not in st.session_state:
+            st.session_state.cross_correlation_noise_seed = int(np.random.randint(2 ** 31))
+        noise_seed = st.session_state.cross_correlation_noise_seed
+
+        if plot_clicked or new_noise:
+            # Function to build the cross-correlation figure
+            def plotting_cross_correlation():
+                t = np.linspace(0, 1, 1000)  # 1 second duration with 1000 samples
+                signal1 = generate_signal_3(signal_choice, t)
+                noise = np.random.default_rng(noise_seed).normal(0, 0.5, signal1.shape)
+                signal2 = signal1 + noise
+                lags, corr_result = cross_correlation(signal1, signal2, max_lag=max_lag or None, weighting=weighting)
+
+                fig, axs = new_figure(3, 1, figsize=(13, 15))
+
+                plot_decimated(axs[0], t, signal1, color='darkblue')
+                axs[0].set_title(f'Original Signal ({signal_choice.capitalize()} Waveform)')
+                axs[0].grid()
+
+                plot_decimated(axs[1], t, signal2, color='red')
+                axs[1].set_title('Original Signal + Noise')
+                axs[1].grid()
 
+                plot_decimated(axs[2], lags, corr_result, color='darkgreen')
+                axs[2].set_title('Cross-Correlation Result of Original Signal and Original Signal + Noise')
+                axs[2].set_xlabel('Lags')
+                axs[2].set_ylabel('Cross-Correlation')
+                axs[2].grid()
+
+                return fig
+
+            figure_key = make_key("cross_correlation", signal_choice, max_lag, weighting, noise_seed)
+            show_cached_figure(figure_key, plotting_cross_correlation)
+
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            upload_file_1 = st.file_uploader("Reference Audio (WAV)", type=["wav"])
+        with col2:
+            upload_file_2 = st.file_uploader("Delayed Audio (WAV)", type=["wav"])
+        max_lag_seconds = st.number_input("Maximum Delay (sec, 0 = all) :", min_value=0.0, value=1.0, step=0.5, format="%.2f")
+
+        if st.button("Align"):
+            if upload_file_1 is None or upload_file_2 is None:
+                st.error("Upload both audio files first!")
+                st.stop()
+            reference, sample_rate_1 = read_mono_wav(upload_file_1)
+            delayed, sample_rate_2 = read_mono_wav(upload_file_2)
+            if sample_rate_1 != sample_rate_2:
+                st.error(f"Sampling rates differ ({sample_rate_1} Hz vs {sample_rate_2} Hz)!")
+                st.stop()
+
+            max_lag = int(max_lag_seconds * sample_rate_1) or None
+            result = estimate_delay(delayed, reference, sample_rate_1, max_lag=max_lag, weighting=weighting)
+            st.info(
+                f"Estimated delay of the second file: {result['delay_seconds'] * 1000:.3f} ms "
+                f"({result['delay_samples']:.2f} samples, peak correlation {result['peak_value']:.4f})"
+            )
+
+            fig, axs = new_figure(3, 1, figsize=(13, 15))
+
+            plot_decimated(axs[0], np.arange(len(reference)) / sample_rate_1, reference, color='darkblue')
+            axs[0].set_title('Reference Audio')
+            axs[0].set_xlabel('Time (s)')
+            axs[0].grid()
+
+            plot_decimated(axs[1], np.arange(len(delayed)) / sample_rate_1, delayed, color='red')
+            axs[1].set_title('Delayed Audio')
+            axs[1].set_xlabel('Time (s)')
+            axs[1].grid()
+
+            plot_decimated(axs[2], result['lags'] / sample_rate_1, result['correlation'], color='darkgreen')
+            axs[2].axvline(result['delay_seconds'], color='black', linestyle='--', label='Estimated Delay')
+            axs[2].set_title('Cross-Correlation of Delayed Audio and Reference Audio')
+            axs[2].set_xlabel('Lag (s)')
+            axs[2].set_ylabel('Cross-Correlation')
+            axs[2].legend()
+            axs[2].grid()
+
+            show_figure(fig)
@@ -1,12 +1,19 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import soundfile as sf
 import streamlit as st
-import wave
-import base64
 from scipy.signal import resample
-import soundfile as sf
-import io
-import wave
+from lab.audio_io import AudioTooLargeError
+from lab.channels import channel_count, map_channels, mix_to_mono
+from lab.chrome import render_chrome
+from lab.figure_cache import make_key, show_cached_figure
+from lab.figures import new_figure
+from lab.ingest import ingest_audio
+from lab.playback import play_audio
+from lab.plotting import plot_decimated
+from lab.resampling import resampled_rate, sample_and_reconstruct
+from lab.resources import resource_audio, resource_bytes
+from lab.spectrum import peak_frequency
+from lab.sweep import aliased_frequency, sweep_sampling_rates
 
 # Set Streamlit page configuration
 st.set_page_config(
@@ -16,167 +23,8 @@ st.set_page_config(
 )
 
 
-# Inject custom CSS for scrollbar styling
-st.markdown("""
-    <style>
-    /* Scrollbar track */
-    ::-webkit-scrollbar {
-        width: 16px;  
-        height: 16px; 
-    }
-
-    /* Scrollbar thumb (the draggable part) */
-    ::-webkit-scrollbar-thumb {
-        background-color: #888;
-        border-radius: 8px;
-        border: 3px solid transparent;
-        background-clip: content-box;
-    }
-
-    /* Scrollbar thumb on hover */
-    ::-webkit-scrollbar-thumb:hover {
-        background-color: #555;
-    }
-
-    /* Scrollbar track */
-    ::-webkit-scrollbar-track {
-        background: #f1f1f1;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Function to encode an image as a Base64 string
-def get_base64_image(image_path):
-    """Encodes an image file to Base64 format."""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception as e:
-        st.error(f"Error encoding image: {e}")
-        return None
-
-# Paths to logo and banner images
-logo_path = "static/fcritlogo.png"  # Ensure this path is correct
-banner_path = "Media/Website_Banner.jpeg"  # Ensure this path is correct
-
-# Encode images in Base64
-logo_base64 = get_base64_image(logo_path)
-banner_base64 = get_base64_image(banner_path)
-
-# Inject custom CSS for header styling
-st.markdown(
-    f"""
-    <style>
-    .header {{
-        position: fixed;
-        left: 0;
-        top: 0;
-        width: 100%;
-        height: 148px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 90px 10px;
-        z-index: 1000;
-        overflow: hidden;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-    }}
-    
-
-    .header p {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 15px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header p1 {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 30px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-        padding-top: 50px; /* Adjust this value to move text down */
-    }}
-
-    .logo-container {{
-        padding-right: 20px;
-        padding-top: 60px;
-    }}
-
-    .logo-container img {{
-        width: 100px;
-        height: auto;
-    }}
-    .stApp {{
-        margin-top: 180px; /* Push content below the fixed header */
-        padding-bottom: 80px; /* Avoid footer overlap */
-    }}
-
-    .footer {{
-        position: fixed;
-        left: 0;
-        bottom: 0;
-        width: 100%;
-        height: 42px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 10px;
-        font-size: 14px;
-        z-index: 1000;
-    }}
-    </style>
-
-    <!-- Header section with logo on the top-right corner -->
-    <div class="header">
-        <div class="header-content">
-            <p><b>AGNEL CHARITIES</b></p>
-            <p1><b>FR. C. RODRIGUES INSTITUTE OF TECHNOLOGY</b></p1>
-            <p>Agnel Technical Education Complex Sector 9-A, Vashi, Navi Mumbai, Maharashtra, India PIN - 400703</p>
-            <p>(An Autonomous Institute & Permanently Affiliated To University Of Mumbai)</p>
-        </div>
-        <div class="logo-container">
-            <img src="data:image/png;base64,{logo_base64}" alt="Institute Logo">
-        </div>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-
-# Inject custom CSS for footer
-st.markdown(
-    """
-    <div class="footer">
-        <p>© Fr. Conceicao Rodrigues Institute of Technology. All rights reserved.</p>
-    </div>
-    """, 
-    unsafe_allow_html=True
-)
-
-# Hide Streamlit default menu
-hide_menu = """
-<style>
-#MainMenu {
-visibility:hidden;
-}
-</style>
-"""
-
-# Remove unnecessary UI elements
-st.markdown("""<style>[data-testid="stDecoration"] { display: none; }</style>""", unsafe_allow_html=True)
-st.markdown(hide_menu, unsafe_allow_html=True)  # Apply hidden menu style
+# Render the shared header, footer and page styling
+render_chrome()
 
 st.header("Nyquist Sampling Theorem", divider=True)
 
@@ -216,17 +64,10 @@ st.markdown("""
 This tool is valuable for **engineers, researchers, and students** in **signal processing, telecommunications, and real-time system design**.
 """)
 
-# Define the local file path
-local_file_path = "Media/audio2 (2).wav"  # Update this with the correct path
-
-# Read the file in binary mode
-with open(local_file_path, "rb") as file:
-    wav_bytes = file.read()
-    # Streamlit download button
-
+# Streamlit download button; the shared resource is only read when clicked
 st.download_button(
     label="Download Audio File",
-    data=wav_bytes,
+    data=lambda: resource_bytes("sampling_audio"),
     file_name="Sampling_audio.wav",
     mime="audio/wav")
 
@@ -235,17 +76,7 @@ st.header("",divider="blue")
 
 # Sidebar: Choose input method
 st.header("Input Signal")
-input_method = st.selectbox("Select Signal Source", ["Generate Tone", "Upload Audio File (.wav)"])
-
-# Function to convert numpy audio to WAV
-def convert_to_wav(audio_array, sample_rate):
-    wav_buffer = io.BytesIO()
-    with wave.open(wav_buffer, 'wb') as wf:
-        wf.setnchannels(1)  # Mono audio
-        wf.setsampwidth(2)  # 16-bit PCM
-        wf.setframerate(sample_rate)
-        wf.writeframes((audio_array * 32767).astype(np.int16).tobytes())
-    return wav_buffer.getvalue()
+input_method = st.selectbox("Select Signal Source", ["Generate Tone", "Upload Audio File (.wav)", "Sample Audio File"])
 
 # Initialize variables
 audio_data = None
@@ -255,11 +86,24 @@ sample_rate = 44100  # Default sample rate
 if input_method == "Upload Audio File (.wav)":
     upload_file = st.file_uploader("Upload an audio file (WAV)", type=["wav"])
 
+    # Multichannel recordings are either mixed down or sampled channel by channel in parallel
+    keep_channels = st.checkbox("Keep all channels (process each channel separately)")
+
     if upload_file:
-        audio_data, sample_rate = sf.read(upload_file)
-        if audio_data.ndim > 1:
-            audio_data = np.mean(audio_data, axis=1)  # Convert to mono
-            st.write(f"Original Sampling Rate: {sample_rate} Hz")
+        try:
+            audio_data, sample_rate = ingest_audio(upload_file, mono=not keep_channels, normalize=False)
+        except AudioTooLargeError as e:
+            st.error(str(e))
+            st.stop()
+        except sf.SoundFileError as e:
+            st.error(f"Could not read the audio file: {e}")
+            st.stop()
+        st.write(f"Original Sampling Rate: {sample_rate} Hz | Channels: {channel_count(audio_data)}")
+
+# Handle the bundled sample, decoded once for every session
+elif input_method == "Sample Audio File":
+    audio_data, sample_rate = resource_audio("sampling_audio", mono=True, normalize=False)
+    st.write(f"Original Sampling Rate: {sample_rate} Hz")
 
 # Handle sine wave generation
 elif input_method == "Generate Tone":
@@ -271,24 +115,16 @@ elif input_method == "Generate Tone":
     audio_data = 0.5 * np.sin(2 * np.pi * frequency * t)
     st.write(f"Generated Tone: Sine |{frequency} Hz | {duration} sec")
 
-# Function to calculate maximum frequency using FFT
-def get_max_frequency(audio_data, sample_rate):
-    N = len(audio_data)
-    fft_data = np.fft.fft(audio_data)
-    fft_freqs = np.fft.fftfreq(N, 1 / sample_rate)
-    positive_freqs = fft_freqs[:N // 2]
-    positive_fft_data = np.abs(fft_data[:N // 2])
-    max_freq_idx = np.argmax(positive_fft_data)
-    return positive_freqs[max_freq_idx]
-
 if audio_data is not None:
-    max_freq = get_max_frequency(audio_data, sample_rate)
+    # The frequency analysis and the sweep use the mono mix
+    mono_audio = mix_to_mono(audio_data)
+    max_freq = peak_frequency(mono_audio, sample_rate)
     st.write(f"Maximum Frequency Component: {max_freq:.2f} Hz")
 
     # Add original audio playback
     st.subheader("Original Audio")
     st.write("🔊 Original Signal")
-    st.audio(convert_to_wav(audio_data, sample_rate), format="audio/wav")
+    play_audio(audio_data, sample_rate)
 
     # Sampling parameters
     default_Fs_under = int(max_freq / 1.5)  # Undersampling (Aliasing)
@@ -303,12 +139,92 @@ if audio_data is not None:
     titles = ["Undersampling (Aliasing)", "Critical Sampling", "Oversampling (No Aliasing)"]
     colors = ["red", "orange", "darkblue"]
 
+    # Filtering before sampling removes the aliasing the other rates demonstrate
+    anti_alias = st.checkbox("Apply anti-aliasing filter before sampling (polyphase resampling)")
+
+    # Reconstruction methods and the kernel implementing each
+    reconstruction_methods = {
+        "Linear Interpolation": "linear",
+        "Zero-Order Hold": "zoh",
+        "Windowed Sinc": "sinc",
+        "Band-Limited (FFT)": "fft",
+    }
+    reconstruction_method = st.selectbox("Reconstruction Method", list(reconstruction_methods))
+
     # Play reconstructed audio (before the plots)
     st.subheader("Reconstructed Audio")
     for i, Fs in enumerate(sampling_rates):
-        sample_indices = np.arange(0, len(audio_data), sample_rate // Fs)
-        sampled_signal = audio_data[sample_indices]
-        reconstructed_signal = np.interp(np.arange(len(audio_data)), sample_indices, sampled_signal)
+        reconstructed_signal = map_channels(
+            sample_and_reconstruct, audio_data, sample_rate, Fs,
+            anti_alias=anti_alias, kernel=reconstruction_methods[reconstruction_method],
+        )
         st.write(f"🔊 {titles[i]} (Fs = {Fs} Hz)")
-        st.audio(convert_to_wav(reconstructed_signal, sample_rate), format="audio/wav")
- 
+        # Polyphase resampling reaches the nearest rational ratio of the source rate
+        if anti_alias and not np.isclose(resampled_rate(sample_rate, Fs), Fs, rtol=0, atol=1e-6):
+            st.caption(f"Achieved sampling rate: {resampled_rate(sample_rate, Fs):.6g} Hz")
+        play_audio(reconstructed_signal, sample_rate)
+
+    # Sweep a whole grid of sampling rates in one batched pass
+    st.subheader("Sampling Rate Sweep")
+    st.markdown("""
+    Evaluate the reconstruction over many sampling rates at once: the **reconstruction SNR**, the **spectral error**, the
+    **apparent (aliased) frequency** and the **reconstructed spectrum** for every rate.
+    """)
+    col1, col2, col3 = st.columns(3)
+    sweep_min = col1.number_input("Lowest Sampling Frequency (Hz)", min_value=1, value=max(int(max_freq / 4), 1))
+    sweep_max = col2.number_input("Highest Sampling Frequency (Hz)", min_value=2, value=max(int(4 * max_freq), 2))
+    sweep_count = col3.number_input("Number of Sampling Rates", min_value=2, max_value=1000, value=500)
+
+    if st.button("Run Sweep"):
+        if sweep_min >= sweep_max:
+            st.error("The lowest sampling frequency must be below the highest one!")
+            st.stop()
+        sweep_rates = np.linspace(sweep_min, sweep_max, int(sweep_count))
+        kernel = reconstruction_methods[reconstruction_method]
+        if anti_alias:
+            rate_errors = np.abs([resampled_rate(sample_rate, rate) - rate for rate in sweep_rates])
+            if rate_errors.max() > 1e-6:
+                st.caption(f"Polyphase resampling approximates {np.count_nonzero(rate_errors > 1e-6)} of the sweep rates, "
+                           f"by at most {rate_errors.max():.3g} Hz")
+
+        # Function to build the sweep figure
+        def plotting_sweep():
+            result = sweep_sampling_rates(mono_audio, sample_rate, sweep_rates, kernel=kernel, anti_alias=anti_alias)
+
+            fig, axs = new_figure(3, 1, figsize=(10, 12))
+            plot_decimated(axs[0], sweep_rates, result["snr_db"], color='darkblue', label='SNR')
+            axs[0].axvline(2 * max_freq, color='orange', linestyle='--', label='Fs = 2Fm')
+            axs[0].set_title("Reconstruction SNR and Spectral Error")
+            axs[0].set_xlabel("Sampling Frequency (Hz)")
+            axs[0].set_ylabel("SNR (dB)")
+            axs[0].grid()
+
+            # Relative spectral error on a second y-axis sharing the sampling frequencies
+            error_ax = axs[0].twinx()
+            plot_decimated(error_ax, sweep_rates, result["spectral_error"], color='purple', label='Spectral Error')
+            error_ax.set_ylabel("Relative Spectral Error")
+            lines = axs[0].get_lines() + error_ax.get_lines()
+            axs[0].legend(lines, [line.get_label() for line in lines])
+
+            plot_decimated(axs[1], sweep_rates, result["peak_frequency"], color='red', label='Measured')
+            plot_decimated(axs[1], sweep_rates, aliased_frequency(max_freq, sweep_rates), color='black', linestyle='--', label='Theoretical')
+            axs[1].set_title("Apparent Frequency of the Strongest Component")
+            axs[1].set_xlabel("Sampling Frequency (Hz)")
+            axs[1].set_ylabel("Frequency (Hz)")
+            axs[1].legend()
+            axs[1].grid()
+
+            heatmap_freqs = result["heatmap_freqs"]
+            axs[2].imshow(
+                20 * np.log10(result["heatmap"].T + 1e-12), origin='lower', aspect='auto', cmap='viridis',
+                extent=(sweep_rates[0], sweep_rates[-1], heatmap_freqs[0], heatmap_freqs[-1]),
+            )
+            axs[2].set_title("Reconstructed Spectrum (dB) vs Sampling Frequency")
+            axs[2].set_xlabel("Sampling Frequency (Hz)")
+            axs[2].set_ylabel("Frequency (Hz)")
+
+            fig.tight_layout()
+            return fig
+
+        figure_key = make_key("sampling_sweep", mono_audio, sample_rate, sweep_rates, kernel, anti_alias)
+        show_cached_figure(figure_key, plotting_sweep)
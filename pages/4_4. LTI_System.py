@@ -1,10 +1,19 @@
-import base64
 import streamlit as st
 import numpy as np
-import scipy.signal as signal
-import scipy.io.wavfile as wav
-import io
-import matplotlib.pyplot as plt
+from lab.chrome import render_chrome
+from lab.channels import map_channels
+from lab.convolution import convolve_partitioned, impulse_response_spectrum
+from lab.figures import new_figure
+from lab.filters import apply_sos_blocks, design_sos, frequency_response
+from lab.ingest import ingest_audio, ingest_upload
+from lab.jobs import JobQueueFullError, cancel_job, cancel_stale_job, collect_job, show_job_progress, submit_job
+from lab.playback import play_audio
+from lab.plotting import plot_decimated
+from lab.resampling import resample
+from lab.resources import resource_audio, resource_bytes
+from lab.session_store import load_array, show_store_usage, store_array
+from lab.figure_cache import make_key, render_cached
+from lab.spectrum import band_spectrum
 
 
 # Set Streamlit page configuration
@@ -14,167 +23,8 @@ st.set_page_config(
     page_icon=" "  # Placeholder for page icon
 )
 
-# Inject custom CSS for scrollbar styling
-st.markdown("""
-    <style>
-    /* Scrollbar track */
-    ::-webkit-scrollbar {
-        width: 16px;  
-        height: 16px; 
-    }
-
-    /* Scrollbar thumb (the draggable part) */
-    ::-webkit-scrollbar-thumb {
-        background-color: #888;
-        border-radius: 8px;
-        border: 3px solid transparent;
-        background-clip: content-box;
-    }
-
-    /* Scrollbar thumb on hover */
-    ::-webkit-scrollbar-thumb:hover {
-        background-color: #555;
-    }
-
-    /* Scrollbar track */
-    ::-webkit-scrollbar-track {
-        background: #f1f1f1;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Function to encode an image as a Base64 string
-def get_base64_image(image_path):
-    """Encodes an image file to Base64 format."""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception as e:
-        st.error(f"Error encoding image: {e}")
-        return None
-
-# Paths to logo and banner images
-logo_path = "static/fcritlogo.png"  # Ensure this path is correct
-banner_path = "Media/Website_Banner.jpeg"  # Ensure this path is correct
-
-# Encode images in Base64
-logo_base64 = get_base64_image(logo_path)
-banner_base64 = get_base64_image(banner_path)
-
-# Inject custom CSS for header styling
-st.markdown(
-    f"""
-    <style>
-    .header {{
-        position: fixed;
-        left: 0;
-        top: 0;
-        width: 100%;
-        height: 148px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 90px 10px;
-        z-index: 1000;
-        overflow: hidden;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-    }}
-    
-
-    .header p {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 15px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header p1 {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 30px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-        padding-top: 50px; /* Adjust this value to move text down */
-    }}
-
-    .logo-container {{
-        padding-right: 20px;
-        padding-top: 60px;
-    }}
-
-    .logo-container img {{
-        width: 100px;
-        height: auto;
-    }}
-    .stApp {{
-        margin-top: 180px; /* Push content below the fixed header */
-        padding-bottom: 80px; /* Avoid footer overlap */
-    }}
-
-    .footer {{
-        position: fixed;
-        left: 0;
-        bottom: 0;
-        width: 100%;
-        height: 42px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 10px;
-        font-size: 14px;
-        z-index: 1000;
-    }}
-    </style>
-
-    <!-- Header section with logo on the top-right corner -->
-    <div class="header">
-        <div class="header-content">
-            <p><b>AGNEL CHARITIES</b></p>
-            <p1><b>FR. C. RODRIGUES INSTITUTE OF TECHNOLOGY</b></p1>
-            <p>Agnel Technical Education Complex Sector 9-A, Vashi, Navi Mumbai, Maharashtra, India PIN - 400703</p>
-            <p>(An Autonomous Institute & Permanently Affiliated To University Of Mumbai)</p>
-        </div>
-        <div class="logo-container">
-            <img src="data:image/png;base64,{logo_base64}" alt="Institute Logo">
-        </div>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-
-# Inject custom CSS for footer
-st.markdown(
-    """
-    <div class="footer">
-        <p>© Fr. Conceicao Rodrigues Institute of Technology. All rights reserved.</p>
-    </div>
-    """, 
-    unsafe_allow_html=True
-)
-
-# Hide Streamlit default menu
-hide_menu = """
-<style>
-#MainMenu {
-visibility:hidden;
-}
-</style>
-"""
-
-# Remove unnecessary UI elements
-st.markdown("""<style>[data-testid="stDecoration"] { display: none; }</style>""", unsafe_allow_html=True)
-st.markdown(hide_menu, unsafe_allow_html=True)  # Apply hidden menu style
+# Render the shared header, footer and page styling
+render_chrome()
 
 
 # Streamlit app title
@@ -230,33 +80,18 @@ A High-Pass Filter with a cutoff frequency of \( 50 \, Hz} \) would block any fr
 
 """)
 
-local_file_path = "Media/LTI_Audio.wav"  # Update this with the correct path
-
-# Read the file in binary mode
-with open(local_file_path, "rb") as file:
-    wav_bytes = file.read()
-    # Streamlit download button
-
+# Streamlit download button; the shared resource is only read when clicked
 st.download_button(
     label="Download Audio File",
-    data=wav_bytes,
+    data=lambda: resource_bytes("lti_audio"),
     file_name="LTI_Audio.wav",
     mime="audio/wav")
 
 
-# Function to convert audio to base64 for browser playback
-def get_audio_base64(audio, sample_rate):
-    buffer = io.BytesIO()
-    wav.write(buffer, sample_rate, (audio * 32767).astype(np.int16))
-    audio_bytes = buffer.getvalue()
-    audio_base64 = base64.b64encode(audio_bytes).decode()
-    return f"data:audio/wav;base64,{audio_base64}"
-
 # Initialize session state variables
-if 'audio' not in st.session_state:
-    st.session_state.audio = None
+# The audio arrays themselves live in the session store, which accounts for their memory
+if 'sample_rate' not in st.session_state:
     st.session_state.sample_rate = None
-    st.session_state.filtered_audio = None
     st.session_state.filter_params = None
 
 # Streamlit app layout
@@ -265,25 +100,39 @@ if 'audio' not in st.session_state:
 # File uploader
 uploaded_file = st.file_uploader("Upload a WAV file", type=["wav"])
 
-if uploaded_file is not None:
+# Multichannel recordings are either mixed down or filtered channel by channel in parallel
+keep_channels = st.checkbox("Keep all channels (process each channel separately)")
+
+# Without an upload, the bundled sample can be used; it is decoded once for every session
+use_sample = uploaded_file is None and st.checkbox("Use the sample audio file instead")
+
+if uploaded_file is not None or use_sample:
     try:
         # Read and process audio file
-        sample_rate, audio = wav.read(uploaded_file)
-        if audio.ndim > 1:
-            audio = np.mean(audio, axis=1)
-        audio = audio / np.max(np.abs(audio))
-        st.session_state.audio = audio
+        if use_sample:
+            audio, sample_rate = resource_audio("lti_sample_audio", mono=not keep_channels, normalize=True)
+            upload_id = ("lti_sample_audio", keep_channels)
+        else:
+            # Large WAV uploads are memory-mapped and scaled lazily instead of decoded into memory
+            audio, sample_rate = ingest_upload(uploaded_file, mono=not keep_channels, normalize=True)
+            upload_id = (uploaded_file.file_id, keep_channels)
+        if st.session_state.get("upload_id") != upload_id or load_array("audio") is None:
+            # A new upload invalidates the previous filter output
+            store_array("audio", audio)
+            store_array("filtered_audio", None)
+            st.session_state.upload_id = upload_id
+            st.session_state.filter_params = None
         st.session_state.sample_rate = sample_rate
         st.success("Audio file loaded successfully!")
         
         # Display original audio
-        st.audio(get_audio_base64(audio, sample_rate), format="audio/wav")
+        play_audio(audio, sample_rate)
         
     except Exception as e:
         st.error(f"Failed to load audio: {e}")
 
 # Filter selection
-filter_type = st.selectbox("Select Filter Type", ["Low-Pass", "High-Pass"])
+filter_type = st.selectbox("Select Filter Type", ["Low-Pass", "High-Pass", "Impulse Response (Convolution)"])
 
 # Cutoff frequency inputs
 nyquist = 0.5 * st.session_state.sample_rate if st.session_state.sample_rate else 22050  # Default Nyquist for error handling
@@ -294,90 +143,194 @@ if filter_type in ["Low-Pass", "High-Pass"]:
 elif filter_type == "Band-Pass":
     low_cutoff = col1.number_input("Lower Cutoff Frequency (Hz)", min_value=1, max_value=int(nyquist), value=500)
     high_cutoff = col2.number_input("Upper Cutoff Frequency (Hz)", min_value=1, max_value=int(nyquist), value=1500)
+elif filter_type == "Impulse Response (Convolution)":
+    # The system is given by its impulse response h, and y = h * x
+    ir_file = st.file_uploader("Upload an impulse response (WAV, e.g. a room response or FIR taps)", type=["wav"])
+
+# Zero-phase filtering runs the filter forward and backward; causal runs it once
+if filter_type != "Impulse Response (Convolution)":
+    filter_mode = st.selectbox("Filtering Mode", ["Zero-Phase (Forward-Backward)", "Causal"])
+
+# Filtering and plotting run as background jobs; these settings identify the filtering job
+filter_settings = make_key(
+    filter_type,
+    cutoff if filter_type in ["Low-Pass", "High-Pass"] else None,
+    (low_cutoff, high_cutoff) if filter_type == "Band-Pass" else None,
+    filter_mode if filter_type != "Impulse Response (Convolution)" else None,
+    ir_file.file_id if filter_type == "Impulse Response (Convolution)" and ir_file is not None else None,
+    # Identifies the audio source and channel layout, sample file included
+    st.session_state.get("upload_id"),
+)
+
+# Function run on the job pool to filter the audio, reporting progress as it goes
+def filtering_job(job, kind, params, audio, sample_rate, zero_phase):
+    if kind == "ir":
+        # Convolve block by block with the partitioned FFT engine, then rescale to full scale
+        output_seconds = (len(audio) + len(params) - 1) / sample_rate
+        filtered_audio = map_channels(convolve_partitioned, audio, params, progress=job.report) if audio.ndim == 2 \
+            else convolve_partitioned(audio, params, progress=lambda fraction: job.report(
+                fraction, f"{fraction * output_seconds:.1f} s ready"))
+        peak = np.max(np.abs(filtered_audio))
+        if peak > 0:
+            filtered_audio /= peak
+    elif audio.ndim == 2:
+        filtered_audio = map_channels(lambda channel: apply_sos_blocks(params, channel, zero_phase=zero_phase),
+                                      audio, progress=job.report)
+    else:
+        # Mono audio reports the seconds filtered so far; zero-phase forward-pass blocks finish none
+        finished = [0]
+
+        def report(start, stop, fraction):
+            finished[0] += stop - start
+            job.report(fraction, f"{finished[0] / sample_rate:.1f} s ready")
+
+        filtered_audio = apply_sos_blocks(params, audio, zero_phase=zero_phase, progress=report)
+    return filtered_audio, (kind, params)
 
 # Apply filter button
 if st.button("Apply Filter"):
-    if st.session_state.audio is None:
+    audio = load_array("audio")
+    if audio is None:
         st.error("No audio file loaded!")
     else:
         try:
             if filter_type == "Low-Pass":
-                normal_cutoff = cutoff / nyquist
-                b, a = signal.butter(6, normal_cutoff, btype='low', analog=False)
+                sos = design_sos("low", 6, cutoff, st.session_state.sample_rate)
             elif filter_type == "High-Pass":
-                normal_cutoff = cutoff / nyquist
-                b, a = signal.butter(6, normal_cutoff, btype='high', analog=False)
+                sos = design_sos("high", 6, cutoff, st.session_state.sample_rate)
             elif filter_type == "Band-Pass":
-                if low_cutoff >= high_cutoff or low_cutoff <= 0 or high_cutoff >= nyquist:
-                    st.error(f"Enter valid frequencies (1-{int(nyquist)} Hz) with low < high.")
-                else:
-                    normal_cutoff = [low_cutoff / nyquist, high_cutoff / nyquist]
-                    b, a = signal.butter(6, normal_cutoff, btype='band', analog=False)
-            
-            # Apply filter
-            st.session_state.filtered_audio = signal.filtfilt(b, a, st.session_state.audio)
-            st.session_state.filter_params = (b, a)
-            st.success("Filter applied! You can now play the filtered audio or plot the response.")
-            
-            # Display filtered audio
-            st.audio(get_audio_base64(st.session_state.filtered_audio, st.session_state.sample_rate), format="audio/wav")
-            
-        except ValueError:
-            st.error("Invalid input! Please enter valid numeric cutoff values.")
+                sos = design_sos("band", 6, (low_cutoff, high_cutoff), st.session_state.sample_rate)
+
+            if filter_type == "Impulse Response (Convolution)":
+                if ir_file is None:
+                    raise ValueError("Upload an impulse response first.")
+                ir, ir_rate = ingest_audio(ir_file, mono=True, normalize=False)
+                if ir_rate != st.session_state.sample_rate:
+                    ir, _ = resample(ir, ir_rate, st.session_state.sample_rate)
+                job_args = ("ir", ir, audio, st.session_state.sample_rate, False)
+            else:
+                job_args = ("sos", sos, audio, st.session_state.sample_rate,
+                            filter_mode.startswith("Zero-Phase"))
+
+            # A new filter makes any pending response plot stale
+            cancel_job("response")
+            submit_job("filter", filter_settings, filtering_job, *job_args)
+
+        except ValueError as e:
+            st.error(f"Invalid input! {e}")
+        except JobQueueFullError as e:
+            st.warning(str(e))
+
+# Changing the settings cancels a filtering job started for the old ones
+cancel_stale_job("filter", filter_settings)
+try:
+    finished, result = collect_job("filter")
+except Exception as e:
+    finished = False
+    st.error(f"Filtering failed: {e}")
+if finished:
+    filtered_audio, st.session_state.filter_params = result
+    store_array("filtered_audio", filtered_audio)
+    st.success("Filter applied! You can now play the filtered audio or plot the response.")
+
+    # Display filtered audio
+    play_audio(filtered_audio, st.session_state.sample_rate)
+else:
+    show_job_progress("filter", "Filtering...")
+
+# Function to plot a spectrum, one line per channel for multichannel audio
+def plot_channels(ax, freqs, magnitude, color):
+    if magnitude.ndim == 1:
+        plot_decimated(ax, freqs, magnitude, color=color)
+        return
+    for channel in range(magnitude.shape[1]):
+        plot_decimated(ax, freqs, magnitude[:, channel], label=f"Channel {channel + 1}", linewidth=0.8)
+    ax.legend(loc="upper right")
+
+# Function to build the filter and spectrum figure
+def plotting_response(job, sample_rate, filter_params, audio, filtered_audio):
+    nyquist = 0.5 * sample_rate
+    kind, params = filter_params
+    if kind == "ir":
+        filter_freq_hz, h = impulse_response_spectrum(params, sample_rate)
+    else:
+        filter_freq_hz, h = frequency_response(params, sample_rate)
+
+    # Set x-axis range
+    max_freq = min(5000, nyquist)
+
+    # Compute the spectra of every channel over the displayed band only
+    freq_hz, fft_original = band_spectrum(audio, sample_rate, 0, max_freq, axis=0)
+    job.report(0.4)
+    # A convolution output is longer than the input, so its spectrum has its own frequency grid
+    filtered_freq_hz, fft_filtered = band_spectrum(filtered_audio, sample_rate, 0, max_freq, axis=0) \
+        if filtered_audio is not None else (None, None)
+    job.report(0.8)
+
+    # Create plots
+    fig, (ax1, ax2, ax3) = new_figure(3, 1, figsize=(10, 8))
+
+    # Filter Frequency Response
+    plot_decimated(ax1, filter_freq_hz, 20 * np.log10(abs(h)), 'black')
+    ax1.set_title("Filter Frequency Response")
+    ax1.set_xlabel("Frequency (Hz)")
+    ax1.set_ylabel("Gain (dB)")
+    ax1.set_xticks(np.arange(250, max_freq+1, 250))
+    ax1.set_xlim(0, max_freq)
+    ax1.grid(color='gray', linestyle='--', linewidth=0.5)
+
+    # FFT of Original Audio
+    plot_channels(ax2, freq_hz, fft_original, 'blue')
+    ax2.set_title("FFT of Original Audio")
+    ax2.set_xlabel("Frequency (Hz)")
+    ax2.set_ylabel("Magnitude")
+    ax2.set_xticks(np.arange(250, max_freq+1, 250))
+    ax2.set_xlim(0, max_freq)
+    ax2.grid(color='gray', linestyle='--', linewidth=0.5)
+
+    # FFT of Filtered Audio
+    if fft_filtered is not None:
+        plot_channels(ax3, filtered_freq_hz, fft_filtered, 'red')
+        ax3.set_title("FFT of Filtered Audio")
+        ax3.set_xlabel("Frequency (Hz)")
+        ax3.set_ylabel("Magnitude")
+        ax3.set_xticks(np.arange(250, max_freq+1, 250))
+        ax3.set_xlim(0, max_freq)
+        ax3.grid(color='gray', linestyle='--', linewidth=0.5)
+
+    fig.tight_layout()
+    return fig
+
+# Function run on the job pool to render the response figure, reusing a cached rendering
+def response_job(job, figure_key, *figure_args):
+    return render_cached(figure_key, lambda: plotting_response(job, *figure_args))
 
 # Plot response button
 if st.button("Plot Response"):
-    if st.session_state.filter_params is None:
+    if st.session_state.filter_params is None or load_array("audio") is None:
         st.error("Apply a filter first to plot the response!")
     else:
-        b, a = st.session_state.filter_params
-        nyquist = 0.5 * st.session_state.sample_rate
-        w, h = signal.freqz(b, a, worN=2000)
-
-        # Compute FFT
-        N = len(st.session_state.audio)
-        N_fft = 2**np.ceil(np.log2(N)).astype(int)
-        freqs = np.fft.fftfreq(N_fft, d=1/st.session_state.sample_rate)
-        fft_original = np.fft.fft(st.session_state.audio, N_fft)
-        fft_filtered = np.fft.fft(st.session_state.filtered_audio, N_fft) if st.session_state.filtered_audio is not None else None
-
-        # Set x-axis range
-        max_freq = min(5000, nyquist)
-        mask = (freqs >= 0) & (freqs <= max_freq)
-        freq_hz = freqs[mask]
-        filter_freq_hz = (w * nyquist / np.pi)
-
-        # Create plots
-        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 8))
-
-        # Filter Frequency Response
-        ax1.plot(filter_freq_hz, 20 * np.log10(abs(h)), 'black')
-        ax1.set_title("Filter Frequency Response")
-        ax1.set_xlabel("Frequency (Hz)")
-        ax1.set_ylabel("Gain (dB)")
-        ax1.set_xticks(np.arange(250, max_freq+1, 250))
-        ax1.set_xlim(0, max_freq)
-        ax1.grid(color='gray', linestyle='--', linewidth=0.5)
-
-        # FFT of Original Audio
-        ax2.plot(freq_hz, np.abs(fft_original[mask]), color='blue')
-        ax2.set_title("FFT of Original Audio")
-        ax2.set_xlabel("Frequency (Hz)")
-        ax2.set_ylabel("Magnitude")
-        ax2.set_xticks(np.arange(250, max_freq+1, 250))
-        ax2.set_xlim(0, max_freq)
-        ax2.grid(color='gray', linestyle='--', linewidth=0.5)
-
-        # FFT of Filtered Audio
-        if fft_filtered is not None:
-            ax3.plot(freq_hz, np.abs(fft_filtered[mask]), color='red')
-            ax3.set_title("FFT of Filtered Audio")
-            ax3.set_xlabel("Frequency (Hz)")
-            ax3.set_ylabel("Magnitude")
-            ax3.set_xticks(np.arange(250, max_freq+1, 250))
-            ax3.set_xlim(0, max_freq)
-            ax3.grid(color='gray', linestyle='--', linewidth=0.5)
-
-        plt.tight_layout()
-        st.pyplot(fig)
-
+        figure_args = (
+            st.session_state.sample_rate,
+            st.session_state.filter_params,
+            load_array("audio"),
+            load_array("filtered_audio"),
+        )
+        figure_key = make_key("lti_response", *figure_args)
+        try:
+            submit_job("response", figure_key, response_job, figure_key, *figure_args)
+        except JobQueueFullError as e:
+            st.warning(str(e))
+
+try:
+    finished, figure_bytes = collect_job("response")
+except Exception as e:
+    finished = False
+    st.error(f"Plotting failed: {e}")
+if finished:
+    st.image(figure_bytes, width="stretch")
+else:
+    show_job_progress("response", "Plotting the response...")
+
+# Report how much memory the session audio takes
+show_store_usage()
@@ -1,9 +1,11 @@
-import scipy.io
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.signal import butter, filtfilt
 import streamlit as st
-import base64
+from lab.chrome import render_chrome
+from lab.figures import new_figure, show_figure
+from lab.filters import filter_signal
+from lab.ingest import ingest_mat
+from lab.resources import resource_bytes, resource_mat
+from lab.plotting import plot_decimated
 
 # Set Streamlit page configuration
 st.set_page_config(
@@ -12,169 +14,8 @@ st.set_page_config(
     page_icon=" "  # Placeholder for page icon
 )
 
-# Inject custom CSS for scrollbar styling
-st.markdown("""
-    <style>
-    /* Scrollbar track */
-    ::-webkit-scrollbar {
-        width: 16px;  
-        height: 16px; 
-    }
-
-    /* Scrollbar thumb (the draggable part) */
-    ::-webkit-scrollbar-thumb {
-        background-color: #888;
-        border-radius: 8px;
-        border: 3px solid transparent;
-        background-clip: content-box;
-    }
-
-    /* Scrollbar thumb on hover */
-    ::-webkit-scrollbar-thumb:hover {
-        background-color: #555;
-    }
-
-    /* Scrollbar track */
-    ::-webkit-scrollbar-track {
-        background: #f1f1f1;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Function to encode an image as a Base64 string
-def get_base64_image(image_path):
-    """Encodes an image file to Base64 format."""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception as e:
-        st.error(f"Error encoding image: {e}")
-        return None
-
-# Paths to logo and banner images
-logo_path = "static/fcritlogo.png"  # Ensure this path is correct
-banner_path = "Media/Website_Banner.jpeg"  # Ensure this path is correct
-
-# Encode images in Base64
-logo_base64 = get_base64_image(logo_path)
-banner_base64 = get_base64_image(banner_path)
-
-# Inject custom CSS for header styling
-st.markdown(
-    f"""
-    <style>
-    .header {{
-        position: fixed;
-        left: 0;
-        top: 0;
-        width: 100%;
-        height: 148px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 90px 10px;
-        z-index: 1000;
-        overflow: hidden;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-    }}
-    
-
-    .header p {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 15px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header p1 {{
-        font-family: "Times New Roman", Times, serif;
-        font-size: 30px;
-        line-height: 1.2;
-        margin: 5px 0;
-    }}
-
-    .header-content {{
-        flex-grow: 1;
-        text-align: center;
-        padding-top: 50px; /* Adjust this value to move text down */
-    }}
-
-    .logo-container {{
-        padding-right: 20px;
-        padding-top: 60px;
-    }}
-
-    .logo-container img {{
-        width: 100px;
-        height: auto;
-    }}
-    .stApp {{
-        margin-top: 180px; /* Push content below the fixed header */
-        padding-bottom: 80px; /* Avoid footer overlap */
-    }}
-
-    .footer {{
-        position: fixed;
-        left: 0;
-        bottom: 0;
-        width: 100%;
-        height: 42px;
-        background-color: #00b3ff;
-        color: #FFFFFF;
-        text-align: center;
-        padding: 10px;
-        font-size: 14px;
-        z-index: 1000;
-    }}
-    </style>
-
-    <!-- Header section with logo on the top-right corner -->
-    <div class="header">
-        <div class="header-content">
-            <p><b>AGNEL CHARITIES</b></p>
-            <p1><b>FR. C. RODRIGUES INSTITUTE OF TECHNOLOGY</b></p1>
-            <p>Agnel Technical Education Complex Sector 9-A, Vashi, Navi Mumbai, Maharashtra, India PIN - 400703</p>
-            <p>(An Autonomous Institute & Permanently Affiliated To University Of Mumbai)</p>
-        </div>
-        <div class="logo-container">
-            <img src="data:image/png;base64,{logo_base64}" alt="Institute Logo">
-        </div>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-
-# Inject custom CSS for footer
-st.markdown(
-    """
-    <div class="footer">
-        <p>© Fr. Conceicao Rodrigues Institute of Technology. All rights reserved.</p>
-    </div>
-    """, 
-    unsafe_allow_html=True
-)
-
-# Hide Streamlit default menu
-hide_menu = """
-<style>
-#MainMenu {
-visibility:hidden;
-}
-</style>
-"""
-
-# Remove unnecessary UI elements
-st.markdown("""<style>[data-testid="stDecoration"] { display: none; }</style>""", unsafe_allow_html=True)
-st.markdown(hide_menu, unsafe_allow_html=True)  # Apply hidden menu style
-
-st.markdown(hide_menu, unsafe_allow_html=True)
+# Render the shared header, footer and page styling
+render_chrome()
 
 # Streamlit UI to select .mat file
 st.header("QRS Complex Filtration",divider=True)
@@ -223,20 +64,12 @@ Combining multiple filtering approaches leads to optimal performance in real-tim
 
 col1, col2, col3 = st.columns(3)
 
-# File paths
-ECG_file_path = "Resources/ECG_sample_sig.mat"
-
-# Read each file separately
-with open(ECG_file_path, "rb") as file:
-    ECG_file_data = file.read()
-
-
 # Column 3 - QRS Filteration
 with col1:
     st.download_button(
         key="ECG",
         label="Download ECG Data",
-        data=ECG_file_data,
+        data=lambda: resource_bytes("ecg_sample"),
         file_name="ECG_sample_sig.mat",
         mime="application/octet-stream"
     )
@@ -245,9 +78,12 @@ st.header("", divider="blue")
 
 uploaded_file = st.file_uploader("ECG File (.mat) :", type=["mat"])
 
-if uploaded_file is not None:
+# Without an upload, the bundled sample can be used; it is decoded once for every session
+use_sample = uploaded_file is None and st.checkbox("Use the sample ECG file instead")
+
+if uploaded_file is not None or use_sample:
     try:
-        data = scipy.io.loadmat(uploaded_file)
+        data = resource_mat("ecg_sample") if use_sample else ingest_mat(uploaded_file)
         st.success(".mat file loaded successfully!")
     except Exception as e:
         st.error(f"Failed to load .mat file: {e}")
@@ -286,11 +122,7 @@ if uploaded_file is not None:
     
     # Create the low-pass filter (Butterworth filter)
     def lowpass_filter(data, cutoff, fs, order=4):
-        nyquist = 0.5 * fs
-        normal_cutoff = cutoff / nyquist
-        b, a = butter(order, normal_cutoff, btype='low', analog=False)
-        y = filtfilt(b, a, data)
-        return y
+        return filter_signal(data, "low", order, cutoff, fs)
     
     # Apply the low-pass filter to the noisy ECG cycle
     ecq_cycle_noisy_filtered = lowpass_filter(ecq_cycle_noisy, cutoff_freq, fs, order)
@@ -300,10 +132,10 @@ if uploaded_file is not None:
     st.info(f"Correlation between the original ECG cycle and the filtered ECG cycle: {correlation:.4f}")
 
     # Plot the ECG signals
-    fig, ax = plt.subplots(3, 1, figsize=(12, 15))
-    ax[0].plot(np.linspace(0, 1, len(ecq_cycle)), ecq_cycle, label='Original ECG Cycle', color='darkblue')
-    ax[1].plot(np.linspace(0, 1, len(ecq_cycle_noisy)), ecq_cycle_noisy, label='Noisy ECG Cycle', color='red')
-    ax[2].plot(np.linspace(0, 1, len(ecq_cycle_noisy_filtered)), ecq_cycle_noisy_filtered, label='Filtered ECG Cycle', color='forestgreen')
+    fig, ax = new_figure(3, 1, figsize=(12, 15))
+    plot_decimated(ax[0], np.linspace(0, 1, len(ecq_cycle)), ecq_cycle, label='Original ECG Cycle', color='darkblue')
+    plot_decimated(ax[1], np.linspace(0, 1, len(ecq_cycle_noisy)), ecq_cycle_noisy, label='Noisy ECG Cycle', color='red')
+    plot_decimated(ax[2], np.linspace(0, 1, len(ecq_cycle_noisy_filtered)), ecq_cycle_noisy_filtered, label='Filtered ECG Cycle', color='forestgreen')
     
     for i, title in enumerate(["Original ECG Cycle", "Noisy ECG Cycle", "Filtered ECG Cycle"]):
         ax[i].set_title(title)
@@ -312,6 +144,6 @@ if uploaded_file is not None:
         ax[i].grid()
         ax[i].legend()
     
-    st.pyplot(fig)
+    show_figure(fig)
     
 